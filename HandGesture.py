@@ -1,110 +1,202 @@
 import cv2
 import mediapipe as mp
+import numpy as np
+import os
 import time
+from gesture_channel import GestureChannel
+from frame_capture import LatestFrameCapture
+from gesture_recording import LandmarkRecorder, LABEL_KEYS
+from swipe_detector import SwipeDetector
+from landmark_tracker import AdaptiveInference, HandROI
+from profiler import profiler
 
 # Initialize MediaPipe Hands and drawing utilities
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 hand_detector = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7)
 
-# Gesture detection variables
-gesture = None
-swipe_threshold_horizontal = 0.1
-swipe_threshold_vertical = 0.1
-prev_position = None
-last_horizontal_gesture_time = 0
-last_vertical_gesture_time = 0
-horizontal_cooldown = 1.0
-vertical_cooldown = 1.0
-
-# Function to detect swipe gestures
-def detect_swipe_gesture(landmarks):
-    global gesture, prev_position, last_horizontal_gesture_time, last_vertical_gesture_time
-
-    # Get the coordinates of the index and middle finger tips (landmarks 8 and 12)
-    index_tip = landmarks[8]
-    middle_tip = landmarks[12]
-
-    # Use the average of index and middle finger tips for swipe detection
-    avg_x = (index_tip.x + middle_tip.x) / 2
-    avg_y = (index_tip.y + middle_tip.y) / 2
-    current_time = time.time()
-
-    if prev_position:
-        dx = avg_x - prev_position[0]
-        dy = prev_position[1] - avg_y
-
-        # Horizontal swipe detection
-        if abs(dx) > abs(dy):
-            if (current_time - last_horizontal_gesture_time) > horizontal_cooldown:
-                if dx > swipe_threshold_horizontal:
-                    gesture = "RIGHT"
-                    last_horizontal_gesture_time = current_time
-                elif dx < -swipe_threshold_horizontal:
-                    gesture = "LEFT"
-                    last_horizontal_gesture_time = current_time
-
-        # Vertical swipe detection
-        else:
-            if (current_time - last_vertical_gesture_time) > vertical_cooldown:
-                if dy > swipe_threshold_vertical:
-                    gesture = "UP"
-                    last_vertical_gesture_time = current_time
-                elif dy < -swipe_threshold_vertical:
-                    gesture = "DOWN"
-                    last_vertical_gesture_time = current_time
-
-    prev_position = (avg_x, avg_y)
-    return gesture
-
-# Function to continuously detect gestures
-def start_gesture_detection():
-    global gesture
-    cap = cv2.VideoCapture(0)
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
+# Swipe detector for the tracked hand (thresholds in normalized units, times in seconds)
+swipe_detector = SwipeDetector()
+
+# Function to detect swipe gestures; current_time defaults to now (replays pass recorded times)
+def detect_swipe_gesture(landmarks, current_time=None):
+    if current_time is None:
+        current_time = time.monotonic()
+    return swipe_detector.update(landmarks, current_time)
+
+# Function to run MediaPipe on a (flipped) BGR frame and return the nearest hand, or None
+def infer_nearest_hand(frame):
+    image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    results = hand_detector.process(image)
+
+    nearest_hand = None
+    if results.multi_hand_landmarks:
+        min_z = float('inf')
+
+        # Find the nearest hand
+        for hand_landmarks in results.multi_hand_landmarks:
+            wrist_z = hand_landmarks.landmark[0].z
+            if wrist_z < min_z:
+                min_z = wrist_z
+                nearest_hand = hand_landmarks
+    return nearest_hand
+
+# Convert MediaPipe hand landmarks to a (21, 3) array of normalized coordinates
+def landmarks_array(hand_landmarks):
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+# Capture counters of the running detector (frames captured/dropped, frame age)
+capture = None
+
+# Headless mode skips all drawing and the debug window (set GESTURE_HEADLESS=1 on cabinets).
+# Otherwise the debug preview is refreshed at most PREVIEW_FPS times per second.
+HEADLESS = os.environ.get('GESTURE_HEADLESS', '0') == '1'
+PREVIEW_FPS = 15
+PREVIEW_WINDOW = 'Hand Gesture Detection'
+
+# Set GESTURE_RECORD to a file path to record the landmarks of every processed frame
+RECORD_PATH = os.environ.get('GESTURE_RECORD')
+
+# Adaptive mode (GESTURE_ADAPTIVE=1) runs MediaPipe only every few frames and tracks the
+# fingertips with optical flow in between, keeping processing under INFERENCE_BUDGET seconds per frame
+ADAPTIVE = os.environ.get('GESTURE_ADAPTIVE', '0') == '1'
+INFERENCE_BUDGET = float(os.environ.get('GESTURE_BUDGET_MS', '12')) / 1000
+
+# ROI mode (GESTURE_ROI=1) runs inference on a crop around the last known hand
+ROI = os.environ.get('GESTURE_ROI', '0') == '1'
+
+# Function to continuously detect gestures and publish them on the gesture channel.
+# The loop ends when the camera stops, when stop_event is set, or on 'q' in the preview.
+# Frames come from the camera, or from ``frames`` (e.g. a shared-memory SharedFrameSource
+# fed by a capture process; see gesture_process.py).
+def start_gesture_detection(channel, headless=None, stop_event=None, preview_fps=PREVIEW_FPS,
+                            record_path=None, adaptive=None, roi=None, on_ready=None, frames=None):
+    global capture
+    if headless is None:
+        headless = HEADLESS
+    if adaptive is None:
+        adaptive = ADAPTIVE
+    if roi is None:
+        roi = ROI
+    adaptive_inference = AdaptiveInference(INFERENCE_BUDGET) if adaptive else None
+    hand_roi = HandROI() if roi else None
+    record_path = record_path or RECORD_PATH
+    recorder = LandmarkRecorder(record_path) if record_path else None
+    preview_interval = 1.0 / preview_fps
+    next_preview_time = 0.0
+    last_gesture = None
+
+    if frames is None:
+        cap = cv2.VideoCapture(0)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # The camera is read on its own thread; inference always takes the newest frame
+        capture = LatestFrameCapture(cap)
+    else:
+        cap = None
+        capture = frames
+
+    # Model loaded and camera open: tell whoever started us (see launcher.py)
+    if on_ready and (cap is None or cap.isOpened()):
+        on_ready()
+
+    while stop_event is None or not stop_event.is_set():
+        with profiler.stage('capture.read'):
+            frame, capture_time = capture.read()
+        if frame is None:
             break
 
-        frame = cv2.flip(frame, 1)
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hand_detector.process(image)
+        with profiler.stage('inference'):
+            frame = cv2.flip(frame, 1)
 
-        if results.multi_hand_landmarks:
+            # In adaptive mode, frames between inference runs are tracked with optical flow;
+            # inference runs anyway when tracking loses the fingertips
             nearest_hand = None
-            min_z = float('inf')
+            hand = None
+            hand_image = frame  # Image the MediaPipe landmarks are relative to
+            if adaptive_inference and not adaptive_inference.should_infer():
+                hand = adaptive_inference.track(frame)
+            if hand is None:
+                start = time.perf_counter()
+                if hand_roi:
+                    # Look around the last known hand first, then fall back to the full frame
+                    hand_image, box = hand_roi.crop(frame)
+                    nearest_hand = infer_nearest_hand(hand_image)
+                    if nearest_hand:
+                        hand = landmarks_array(nearest_hand)
+                        if box:
+                            hand = hand_roi.to_frame(hand, box, frame.shape)
+                    elif box:
+                        hand_image = frame
+                        nearest_hand = infer_nearest_hand(frame)
+                        hand = landmarks_array(nearest_hand) if nearest_hand else None
+                    hand_roi.update(hand, frame.shape)
+                else:
+                    nearest_hand = infer_nearest_hand(frame)
+                    hand = landmarks_array(nearest_hand) if nearest_hand else None
+                if adaptive_inference:
+                    adaptive_inference.inferred(frame, hand, time.perf_counter() - start)
+        inferred_time = time.monotonic()
+
+        if hand is not None:
+            with profiler.stage('swipe'):
+                detected_gesture = detect_swipe_gesture(hand, capture_time)
+
+                # Publish the gesture to the game
+                if detected_gesture:
+                    channel.publish(detected_gesture, capture_time, inferred_time)
+                    last_gesture = detected_gesture
 
-            # Find the nearest hand
-            for hand_landmarks in results.multi_hand_landmarks:
-                wrist_z = hand_landmarks.landmark[0].z
-                if wrist_z < min_z:
-                    min_z = wrist_z
-                    nearest_hand = hand_landmarks
+        if recorder:
+            recorder.add(capture_time, hand)
 
-            if nearest_hand:
-                detected_gesture = detect_swipe_gesture(nearest_hand.landmark)
-                
-                # Write the gesture to the file only if it changes
-                if detected_gesture:
-                    with open('gesture.txt', 'w') as f:
-                        f.write(detected_gesture)
-                    gesture = None  # Reset only after writing to ensure proper detection
+        if headless:
+            continue
 
-                # Draw landmarks only for the nearest hand
-                mp_drawing.draw_landmarks(frame, nearest_hand, mp_hands.HAND_CONNECTIONS)
+        # Debug preview, refreshed at a capped rate
+        now = time.monotonic()
+        if now < next_preview_time:
+            continue
+        next_preview_time = now + preview_interval
 
-                if detected_gesture:
-                    cv2.putText(frame, f"Gesture: {detected_gesture}", (50, 50),
-                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
-
-        # Display the frame
-        
-        cv2.imshow('Hand Gesture Detection', frame)
-        
-        # Quit with 'q' key
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        with profiler.stage('preview'):
+            # Draw landmarks only for the nearest hand; tracked frames only have the fingertips
+            if nearest_hand:
+                # hand_image is a view into frame when inference ran on a crop
+                mp_drawing.draw_landmarks(hand_image, nearest_hand, mp_hands.HAND_CONNECTIONS)
+            elif hand is not None:
+                height, width = frame.shape[:2]
+                for x, y, _ in hand[[8, 12]]:
+                    cv2.circle(frame, (int(x * width), int(y * height)), 6, (0, 255, 255), -1)
+            if last_gesture:
+                cv2.putText(frame, f"Gesture: {last_gesture}", (50, 50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2, cv2.LINE_AA)
+
+            cv2.imshow(PREVIEW_WINDOW, frame)
+
+            # Quit with 'q' key; while recording, L/R/U/D label a swipe onset
+            key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
             break
-
-    cap.release()
-    cv2.destroyAllWindows()
+        if recorder and key in LABEL_KEYS:
+            recorder.label(capture_time, LABEL_KEYS[key])
+
+    capture.stop()
+    if recorder:
+        recorder.close()
+    if cap is not None:
+        cap.release()
+    if not headless:
+        cv2.destroyAllWindows()
+    print("Gesture capture stats:", capture.stats())
+    if adaptive_inference:
+        print("Adaptive inference stats:", adaptive_inference.stats())
+
+
+if __name__ == "__main__":
+    # Started by launcher.py: the channel name comes from the environment
+    channel = GestureChannel.attach()
+    try:
+        start_gesture_detection(channel)
+    finally:
+        channel.close()
@@ -0,0 +1,245 @@
+"""Lazy asset loading with an on-disk cache of scaled images.
+
+Images and sounds are loaded the first time they are asked for and kept in
+memory. Scaled images are also written to ``cache_dir`` as raw pixels, in a
+file named after the source (its name and a short hash of its path), its
+modification time and the target size, so later starts read them back
+without decoding or scaling the original. Images are converted to the
+display format once a display is open.
+
+Animated GIFs are cached the same way as one sprite sheet holding every
+frame, scaled, side by side, along with the frame durations, so PIL is only
+needed the first time a GIF is seen.
+"""
+import bisect
+import glob
+import hashlib
+import itertools
+import os
+import struct
+import threading
+
+import pygame
+
+from scores import write_atomic
+
+CACHE_ENV = 'SNAKE_ASSET_CACHE'
+DEFAULT_CACHE_DIR = '.asset_cache'
+CACHE_HEADER = struct.Struct('<4sII')  # Pixel format, width, height
+ANIMATION_HEADER = struct.Struct('<II')  # Frame count, frame width; then one uint32 duration per frame
+DEFAULT_FRAME_MS = 100  # Used for GIF frames without a usable duration, as browsers do
+
+
+def fit_size(size, max_size):
+    """Scale ``size`` down to ``max_size`` along its longer side, keeping the aspect ratio."""
+    width, height = size
+    aspect_ratio = width / height
+    if width > height:
+        new_width = min(width, max_size[0])
+        new_height = new_width / aspect_ratio
+    else:
+        new_height = min(height, max_size[1])
+        new_width = new_height * aspect_ratio
+    return int(new_width), int(new_height)
+
+
+def encode_surface(surface, alpha):
+    pixel_format = 'RGBA' if alpha else 'RGB'
+    return CACHE_HEADER.pack(pixel_format.encode(), *surface.get_size()) + pygame.image.tobytes(surface, pixel_format)
+
+
+def decode_surface(data, offset=0):
+    """Return the surface encoded at ``offset`` of ``data``, or None if it is damaged."""
+    try:
+        pixel_format, width, height = CACHE_HEADER.unpack_from(data, offset)
+    except struct.error:
+        return None
+    pixel_format = pixel_format.rstrip(b'\0').decode()
+    pixels = memoryview(data)[offset + CACHE_HEADER.size:]
+    if len(pixels) != width * height * len(pixel_format):
+        return None
+    return pygame.image.frombytes(bytes(pixels), (width, height), pixel_format)
+
+
+class Animation:
+    """Frames of an animation side by side in one sprite sheet, with durations in milliseconds."""
+
+    def __init__(self, sheet, frame_width, durations):
+        self.sheet = sheet
+        self.durations = durations
+        self.frame_size = (frame_width, sheet.get_height())
+        self.rects = [pygame.Rect(i * frame_width, 0, *self.frame_size) for i in range(len(durations))]
+        self._ends = list(itertools.accumulate(durations))
+        self.converted = False
+
+    def get_width(self):
+        return self.frame_size[0]
+
+    def get_height(self):
+        return self.frame_size[1]
+
+    def frame_at(self, ms):
+        """Index of the frame showing ``ms`` milliseconds after the animation started, looping."""
+        return bisect.bisect_right(self._ends, ms % self._ends[-1])
+
+    def ms_to_next_frame(self, ms):
+        """Milliseconds from ``ms`` until the frame after the one showing at ``ms``."""
+        loop = ms % self._ends[-1]
+        return self._ends[bisect.bisect_right(self._ends, loop)] - loop
+
+    def draw(self, surface, position, ms):
+        surface.blit(self.sheet, position, self.rects[self.frame_at(ms)])
+
+
+class AssetManager:
+    """Loads images and sounds on first use."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.environ.get(CACHE_ENV, DEFAULT_CACHE_DIR)
+        self._images = {}
+        self._sounds = {}
+        self._animations = {}
+        self._lock = threading.Lock()  # Animations may be loaded from a background thread
+
+    def cache_path(self, path, size, tag=''):
+        """Cache file for ``path`` at ``size``; changes whenever the source is modified."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        # Sources with the same file name in different directories get their own entries
+        digest = hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode()).hexdigest()[:8]
+        mtime = os.stat(path).st_mtime_ns
+        return os.path.join(self.cache_dir, f"{name}.{digest}{tag}-{size[0]}x{size[1]}-{mtime}.raw")
+
+    @staticmethod
+    def read_file(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def read_cached(self, cache_path):
+        """Return the surface stored at ``cache_path``, or None if it is missing or damaged."""
+        data = self.read_file(cache_path)
+        return None if data is None else decode_surface(data)
+
+    def write_cached(self, cache_path, data):
+        """Store ``data`` at ``cache_path`` and remove entries for older versions of the source."""
+        prefix = cache_path.rsplit('-', 1)[0]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_atomic(cache_path, data)
+            for stale in glob.glob(glob.escape(prefix) + '-*.raw'):
+                if stale != cache_path:
+                    os.remove(stale)
+        except OSError as e:
+            print(f"Could not cache {cache_path}: {e}")
+
+    @staticmethod
+    def convert(surface, alpha):
+        # convert() needs a display mode; before that the surface is used as loaded
+        if not pygame.display.get_init() or pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def image(self, path, size=None, alpha=False):
+        """Return the image at ``path``, scaled to ``size`` if given, in the display format."""
+        key = (path, size, alpha)
+        if key in self._images:
+            return self._images[key]
+        if size is None:
+            surface = pygame.image.load(path)
+        else:
+            size = tuple(size)
+            # RGB and RGBA copies are cached separately, so an opaque copy never stands in for an alpha one
+            cache_path = self.cache_path(path, size, tag='.rgba' if alpha else '')
+            surface = self.read_cached(cache_path)
+            if surface is None:
+                surface = pygame.transform.scale(pygame.image.load(path), size)
+                self.write_cached(cache_path, encode_surface(surface, alpha))
+        surface = self.convert(surface, alpha)
+        # Only cache converted surfaces, so an early call does not pin the unconverted one
+        if pygame.display.get_surface() is not None:
+            self._images[key] = surface
+        return surface
+
+    def _read_animation(self, cache_path):
+        data = self.read_file(cache_path)
+        if data is None:
+            return None
+        try:
+            count, frame_width = ANIMATION_HEADER.unpack_from(data)
+            durations = list(struct.unpack_from(f'<{count}I', data, ANIMATION_HEADER.size))
+        except struct.error:
+            return None
+        sheet = decode_surface(data, ANIMATION_HEADER.size + 4 * count)
+        if sheet is None or not count or sheet.get_width() != count * frame_width:
+            return None
+        return Animation(sheet, frame_width, durations)
+
+    def _decode_gif(self, path, max_size):
+        from PIL import Image  # Only needed until the sprite sheet is cached
+
+        with Image.open(path) as gif:
+            frame_size = fit_size(gif.size, max_size)
+            count = getattr(gif, 'n_frames', 1)
+            alpha = False
+            sheet = pygame.Surface((frame_size[0] * count, frame_size[1]), pygame.SRCALPHA)
+            durations = []
+            for index in range(count):
+                gif.seek(index)
+                alpha = alpha or 'transparency' in gif.info
+                frame = pygame.image.frombytes(gif.convert('RGBA').tobytes(), gif.size, 'RGBA')
+                sheet.blit(pygame.transform.scale(frame, frame_size), (index * frame_size[0], 0))
+                duration = gif.info.get('duration') or 0
+                durations.append(int(duration) if duration >= 20 else DEFAULT_FRAME_MS)
+        if not alpha:
+            # Opaque GIFs are kept without an alpha channel
+            opaque = pygame.Surface(sheet.get_size())
+            opaque.blit(sheet, (0, 0))
+            sheet = opaque
+        return Animation(sheet, frame_size[0], durations), alpha
+
+    def animation(self, path, max_size, convert=True):
+        """Return the GIF at ``path`` as an Animation whose frames fit ``max_size``.
+
+        Pass ``convert=False`` when preloading from a background thread; the
+        sheet is converted to the display format on the next call from the
+        main thread.
+        """
+        key = (path, tuple(max_size))
+        with self._lock:
+            animation = self._animations.get(key)
+            if animation is None:
+                cache_path = self.cache_path(path, max_size, tag='.sheet')
+                animation = self._read_animation(cache_path)
+                if animation is None:
+                    animation, alpha = self._decode_gif(path, max_size)
+                    self.write_cached(cache_path, ANIMATION_HEADER.pack(len(animation.durations), animation.get_width())
+                                      + struct.pack(f'<{len(animation.durations)}I', *animation.durations)
+                                      + encode_surface(animation.sheet, alpha))
+                self._animations[key] = animation
+            if convert and not animation.converted and pygame.display.get_surface() is not None:
+                animation.sheet = self.convert(animation.sheet, animation.sheet.get_flags() & pygame.SRCALPHA)
+                animation.converted = True
+        return animation
+
+    def preload_animations(self, *requests):
+        """Load ``(path, max_size)`` animations in a background thread."""
+        def load():
+            for path, max_size in requests:
+                try:
+                    self.animation(path, max_size, convert=False)
+                except (OSError, pygame.error) as e:
+                    print(f"Could not load {path}: {e}")
+        thread = threading.Thread(target=load, name='asset-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def sound(self, path):
+        if path not in self._sounds:
+            self._sounds[path] = pygame.mixer.Sound(path)
+        return self._sounds[path]
+
+
+# Shared by the menu and the game
+assets = AssetManager()
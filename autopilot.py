@@ -0,0 +1,266 @@
+"""Autopilot: plays the snake by itself, for soak and performance testing.
+
+Each tick ``Autopilot.next_move`` picks the direction to turn to. It follows
+an A* path to the food over the occupancy grid and falls back on a
+Hamiltonian cycle through the whole board. Every move has to keep the body
+in cycle order between the tail and the head: a move may skip ahead on the
+cycle while the snake is short and there is room, but never past the tail,
+and the next cell on the cycle is always allowed. So the snake does not
+trap itself and ends up filling the board.
+
+The path is searched only when the food moves and then followed for as
+long as its steps stay safe. The search buffers are allocated once per
+board and reused: a cell's cost and parent count only when its stamp is
+the current search's, so nothing is cleared between searches.
+
+``soak`` plays games back to back without a display and logs ticks per
+second and the longest snake (see benchmarks/soak_autopilot.py);
+SNAKE_AUTOPILOT=1 lets the autopilot drive the rendered game instead of
+hand gestures. This module must not import pygame.
+"""
+import heapq
+import time
+from array import array
+
+import snake_engine
+from snake_engine import DIRECTIONS, OPPOSITE
+
+# Shortcuts off the cycle are taken only while the snake covers less than this share of the
+# board, and only if they leave at least its length plus SHORTCUT_SLACK cells before the tail
+SHORTCUT_LIMIT = 0.5
+SHORTCUT_SLACK = 4
+MAX_EXPANSIONS = 100_000  # Cells one search may expand before it gives up on the food
+
+
+def hamiltonian_cycle(width, height):
+    """Position on a cycle through every cell of the board, per cell (indexed y * width + x).
+
+    The cycle runs along the first row, zigzags back over the other rows
+    leaving out the first column, and returns up the first column; with an
+    odd number of rows the same is done with columns. A board with both
+    sides odd has no such cycle.
+    """
+    if width < 2 or height < 2 or width % 2 and height % 2:
+        raise ValueError(f"No Hamiltonian cycle on a {width}x{height} board")
+    order = array('i', bytes(4 * width * height))
+    if height % 2:
+        lines, length = width, height  # Zigzag columns, so there is an even number of them
+        def index(i, line):
+            return i * width + line
+    else:
+        lines, length = height, width
+        def index(i, line):
+            return line * width + i
+
+    position = 0
+    for i in range(length):
+        order[index(i, 0)] = position
+        position += 1
+    for line in range(1, lines):
+        for i in range(length - 1, 0, -1) if line % 2 else range(1, length):
+            order[index(i, line)] = position
+            position += 1
+    for line in range(lines - 1, 0, -1):
+        order[index(0, line)] = position
+        position += 1
+    return order
+
+
+class Autopilot:
+    """Chooses the snake's moves on a ``width`` x ``height`` board."""
+
+    def __init__(self, width, height, max_expansions=MAX_EXPANSIONS):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.order = hamiltonian_cycle(width, height)
+        self.max_expansions = max_expansions
+        self.moves = {offset: direction for direction, offset in DIRECTIONS.items()}
+
+        # A* buffers shared by every search
+        self.cost = array('i', bytes(4 * self.cells))
+        self.parent = array('i', bytes(4 * self.cells))
+        self.stamp = array('I', bytes(4 * self.cells))
+        self.search = 0
+        self.heap = []
+
+        self.path = []  # Cells still to visit, the next one last
+        self.target = None  # Food the path was searched for
+        self.searches = 0
+        self.fallbacks = 0
+
+    def reset(self):
+        """Forget the path, e.g. for a new game."""
+        self.path.clear()
+        self.target = None
+
+    def next_move(self, state):
+        """Direction to turn to before the next step, or None if every move is fatal."""
+        width = self.width
+        hx, hy = state.head
+        head = hy * width + hx
+        tx, ty = state.body[0]
+        tail = ty * width + tx
+        pending = state.length - len(state.body)  # Segments still to grow
+
+        if state.food != self.target:
+            self.target = state.food
+            self.path.clear()
+            if state.food is not None and len(state.body) + pending < self.cells * SHORTCUT_LIMIT:
+                self.plan(state, head, tail, pending)
+        if self.path:
+            cell = self.path[-1]
+            direction = self.moves[(cell % width - hx, cell // width - hy)]
+            if direction != OPPOSITE[state.direction] and self.safe(state, head, cell, tail, pending):
+                self.path.pop()
+                return direction
+            # Off the path until the food moves again
+            self.path.clear()
+            self.fallbacks += 1
+        return self.along_cycle(state, head, tail, pending)
+
+    def safe(self, state, head, cell, tail, pending):
+        """Whether moving the head into ``cell`` keeps the body in cycle order with room to grow."""
+        # The tail's cell is free by the time the head gets there, unless the snake is growing
+        if state.grid[cell] and (cell != tail or pending):
+            return False
+        order, cells = self.order, self.cells
+        base = order[tail]
+        ahead = (order[cell] - base) % cells
+        if ahead == (order[head] - base + 1) % cells:
+            return True  # The next cell on the cycle
+        if ahead <= (order[head] - base) % cells:
+            return False
+        length = len(state.body) + pending + (state.food is not None and cell == self._food(state))
+        return length < cells * SHORTCUT_LIMIT and cells - ahead - 1 >= length + SHORTCUT_SLACK
+
+    def _food(self, state):
+        return state.food[1] * self.width + state.food[0]
+
+    def along_cycle(self, state, head, tail, pending):
+        """The safe move that gets furthest along the cycle towards the food."""
+        order, cells, width = self.order, self.cells, self.width
+        goal = order[self._food(state)] if state.food is not None else order[head]
+        hx, hy = head % width, head // width
+        best, best_distance = None, cells
+        for direction, (dx, dy) in DIRECTIONS.items():
+            x, y = hx + dx, hy + dy
+            if direction == OPPOSITE[state.direction] or not (0 <= x < width and 0 <= y < self.height):
+                continue
+            cell = y * width + x
+            distance = (goal - order[cell]) % cells
+            if distance < best_distance and self.safe(state, head, cell, tail, pending):
+                best, best_distance = direction, distance
+        return best
+
+    def plan(self, state, head, tail, pending):
+        """A* from the head to the food over the free cells; the path goes into ``self.path``."""
+        self.searches += 1
+        self.search += 1
+        search = self.search
+        width, height, grid = self.width, self.height, state.grid
+        cost, parent, stamp, heap = self.cost, self.parent, self.stamp, self.heap
+        fx, fy = state.food
+        food = fy * width + fx
+        rx, ry = DIRECTIONS[OPPOSITE[state.direction]]
+        reverse = (head // width + ry) * width + head % width + rx  # The engine will not turn back
+
+        heap.clear()
+        stamp[head], cost[head] = search, 0
+        # Entries are (cost + distance, -cost, cell): ties go to the cell nearest the food
+        heap.append((abs(head % width - fx) + abs(head // width - fy), 0, head))
+        expansions = 0
+        while heap:
+            _, g, cell = heapq.heappop(heap)
+            g = -g
+            if cell == food:
+                break
+            if g > cost[cell]:
+                continue  # Reached again more cheaply since it was pushed
+            expansions += 1
+            if expansions > self.max_expansions:
+                return
+            x, y = cell % width, cell // width
+            g += 1
+            for dx, dy in DIRECTIONS.values():
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                n = ny * width + nx
+                if grid[n] and (n != tail or pending) or cell == head and n == reverse:
+                    continue
+                if stamp[n] != search or g < cost[n]:
+                    stamp[n], cost[n], parent[n] = search, g, cell
+                    heapq.heappush(heap, (g + abs(nx - fx) + abs(ny - fy), -g, n))
+        else:
+            return
+
+        path = self.path
+        while food != head:
+            path.append(food)
+            food = parent[food]
+
+
+class SoakStats:
+    """Ticks per second, games and the longest snake, logged every ``interval`` seconds."""
+
+    def __init__(self, interval=10.0, log=print):
+        self.interval = interval
+        self.log = log
+        self.start = self.last_log = time.perf_counter()
+        self.ticks = self.logged_ticks = 0
+        self.games = self.deaths = self.wins = 0
+        self.max_length = 0
+
+    def game_over(self, state, ticks):
+        """Count a finished game that ran ``ticks`` ticks."""
+        self.ticks += ticks
+        self.games += 1
+        if state.alive:
+            self.wins += 1
+        else:
+            self.deaths += 1
+        self.max_length = max(self.max_length, len(state.body))
+
+    def maybe_log(self, ticks=0, length=0):
+        """Log if ``interval`` has passed; ``ticks`` and ``length`` describe the game still running."""
+        now = time.perf_counter()
+        if now - self.last_log >= self.interval:
+            self.log(self.summary(ticks, length))
+            self.last_log, self.logged_ticks = now, self.ticks + ticks
+
+    def summary(self, ticks=0, length=None):
+        """Rate since the last log line, or since the start for the final line (no ``length``)."""
+        now = time.perf_counter()
+        since, base = (self.start, 0) if length is None else (self.last_log, self.logged_ticks)
+        rate = (self.ticks + ticks - base) / max(now - since, 1e-9)
+        line = (f"[{now - self.start:8.1f}s] {rate:>10,.0f} ticks/s  ticks {self.ticks + ticks:,}"
+                f"  games {self.games} (won {self.wins}, died {self.deaths})"
+                f"  max length {max(self.max_length, length or 0)}")
+        return line if length is None else f"{line}  length {length}"
+
+
+def soak(width, height, duration, interval=10.0, seed=None, log=print):
+    """Play games headless for ``duration`` seconds and log their progress; return the SoakStats."""
+    pilot = Autopilot(width, height)
+    stats = SoakStats(interval, log)
+    end = time.perf_counter() + duration
+    game = 0
+    while time.perf_counter() < end:
+        state = snake_engine.new_state(width, height, seed=None if seed is None else seed + game)
+        pilot.reset()
+        game += 1
+        ticks = 0
+        # A game ends when the snake dies or fills the board (no food left)
+        while state.food is not None and time.perf_counter() < end:
+            for _ in range(1024):
+                snake_engine.turn(state, pilot.next_move(state))
+                ticks += 1
+                if snake_engine.step(state) == snake_engine.DIED or state.food is None:
+                    break
+            if not state.alive:
+                break
+            stats.maybe_log(ticks, len(state.body))
+        stats.game_over(state, ticks)
+    log(stats.summary())
+    return stats
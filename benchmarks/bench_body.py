@@ -0,0 +1,61 @@
+"""Tick cost of the snake engine as the snake gets longer.
+
+The engine keeps the body in a deque next to an occupancy grid, so tail
+removal and self-collision do not depend on the snake length. For contrast
+the previous list-based body (``del body[0]`` and a scan of ``body[:-1]``)
+is timed on the same snakes.
+
+Run from the repository root: python benchmarks/bench_body.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_engine  # noqa: E402
+
+BOARD = 1000  # 1000 x 1000 cells
+TICKS = 500
+LENGTHS = (10, 100, 1_000, 10_000, 100_000)
+
+
+def serpentine(length):
+    """A body of ``length`` cells filling rows from the bottom, tail first."""
+    cells = []
+    y = BOARD - 1
+    while len(cells) < length:
+        row = range(BOARD) if (BOARD - 1 - y) % 2 == 0 else range(BOARD - 1, -1, -1)
+        cells.extend((x, y) for x in row)
+        y -= 1
+    return cells[:length]
+
+
+def engine_tick_ns(length):
+    state = snake_engine.new_state(BOARD, BOARD, seed=1)
+    snake_engine.set_body(state, serpentine(length), 'UP')
+    state.food = (0, 0)
+    start = time.perf_counter_ns()
+    for _ in range(TICKS):
+        snake_engine.step(state)
+    return (time.perf_counter_ns() - start) / TICKS
+
+
+def list_tick_ns(length):
+    body = [list(cell) for cell in serpentine(length)]
+    x, y = body[-1]
+    start = time.perf_counter_ns()
+    for _ in range(TICKS):
+        y -= 1
+        head = [x, y]
+        body.append(head)
+        del body[0]
+        for block in body[:-1]:
+            if block == head:
+                break
+    return (time.perf_counter_ns() - start) / TICKS
+
+
+if __name__ == "__main__":
+    print(f"{'length':>8} {'engine ns/tick':>15} {'list ns/tick':>15}")
+    for length in LENGTHS:
+        print(f"{length:>8} {engine_tick_ns(length):>15,.0f} {list_tick_ns(length):>15,.0f}")
@@ -0,0 +1,47 @@
+"""Throughput of the headless snake engine.
+
+Run from the repository root: python benchmarks/bench_engine.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import snake_engine  # noqa: E402
+
+GRID_WIDTH, GRID_HEIGHT = 40, 30
+
+
+def bench_single(ticks=200_000):
+    """One board, random turns, restarted whenever the snake dies."""
+    actions = list(snake_engine.DIRECTIONS)
+    state = snake_engine.new_state(GRID_WIDTH, GRID_HEIGHT, seed=1)
+    rng = state.rng
+    start = time.perf_counter()
+    for _ in range(ticks):
+        if snake_engine.step(state, rng.choice(actions)) == snake_engine.DIED:
+            state = snake_engine.new_state(GRID_WIDTH, GRID_HEIGHT, seed=1)
+    elapsed = time.perf_counter() - start
+    print(f"single board:        {ticks / elapsed:>14,.0f} ticks/s")
+
+
+def bench_batch(boards=4096, steps=500):
+    """Many boards per call, random turns, dead boards restarted every step."""
+    engine = snake_engine.BatchEngine(boards, GRID_WIDTH, GRID_HEIGHT, seed=1)
+    rng = np.random.default_rng(2)
+    actions = rng.integers(snake_engine.NO_ACTION, 4, size=(steps, boards), dtype=np.int8)
+    start = time.perf_counter()
+    for i in range(steps):
+        _, died = engine.step(actions[i])
+        if died.any():
+            engine.reset(died)
+    elapsed = time.perf_counter() - start
+    print(f"batch of {boards:>5} boards: {boards * steps / elapsed:>14,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    bench_single()
+    for boards in (256, 4096, 16384):
+        bench_batch(boards)
@@ -0,0 +1,64 @@
+"""Frame cost of the renderers as the board and the snake get bigger.
+
+The body is kept on a layer that each tick updates cell by cell, and only
+the cells inside the view are ever painted, so a frame should cost about
+the same on the screen-sized board as on a 1000 x 1000 one, whatever the
+snake length. Uses SDL's dummy video driver, so no window is opened.
+
+Run from the repository root: python benchmarks/bench_render.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pygame  # noqa: E402
+
+import snake_engine  # noqa: E402
+from renderer import FullRenderer, DirtyRectRenderer  # noqa: E402
+
+SCREEN = (800, 600)
+BLOCK = 20
+FRAMES = 200
+CASES = ((40, 30, 10), (40, 30, 1_000), (1000, 1000, 10), (1000, 1000, 10_000), (1000, 1000, 100_000))
+COLORS = ((0, 255, 0), (50, 153, 213), (213, 50, 80))
+
+
+def coiled_state(width, height, length):
+    """A snake of ``length`` cells coiled in rows around the board centre, heading up."""
+    state = snake_engine.new_state(width, height, seed=1)
+    rows = -(-length // width)
+    top = max((height - rows) // 2, 1)
+    cells = []
+    for y in range(top + rows - 1, top - 1, -1):
+        row = range(width) if (top + rows - 1 - y) % 2 == 0 else range(width - 1, -1, -1)
+        cells.extend((x, y) for x in row)
+    snake_engine.set_body(state, cells[:length], 'UP')
+    return state
+
+
+def frame_ms(renderer_class, screen, background, score, width, height, length):
+    state = coiled_state(width, height, length)
+    renderer = renderer_class(screen, background, None, BLOCK, COLORS)
+    renderer.reset()
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        if i % 4 == 0:
+            snake_engine.step(state)
+            renderer.tick(state)
+        renderer.draw(state, score, None, (i % 4) / 4)
+    return (time.perf_counter() - start) * 1000 / FRAMES
+
+
+if __name__ == "__main__":
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN)
+    background = pygame.Surface(SCREEN)
+    background.fill((30, 30, 30))
+    score = pygame.font.Font(None, 35).render("Score: 0", True, (255, 255, 102))
+    print(f"{'board':>10} {'length':>8} {'full ms/frame':>14} {'dirty ms/frame':>15}")
+    for width, height, length in CASES:
+        full = frame_ms(FullRenderer, screen, background, score, width, height, length)
+        dirty = frame_ms(DirtyRectRenderer, screen, background, score, width, height, length)
+        print(f"{f'{width}x{height}':>10} {length:>8} {full:>14.3f} {dirty:>15.3f}")
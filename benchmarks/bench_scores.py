@@ -0,0 +1,54 @@
+"""Score store cost as the history grows.
+
+Builds journals of up to a few million entries and times opening the store
+without an index (a full scan, done once), opening it again from the index,
+appending a score and reading the top 10.
+
+Run from the repository root: python benchmarks/bench_scores.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scores import ScoreStore, index_path  # noqa: E402
+
+SIZES = (1_000, 100_000, 1_000_000, 3_000_000)
+
+
+def write_journal(path, entries):
+    rng = random.Random(1)
+    with open(path, 'w') as file:
+        for i in range(entries):
+            file.write(f"{rng.randrange(500)}\tplayer{i % 97}\t{1_700_000_000 + i}.000\n")
+        file.flush()
+        os.fsync(file.fileno())  # Keep the first append from paying for syncing the whole journal
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'entries':>10} {'scan ms':>10} {'indexed ms':>11} {'add ms':>8} {'top10 us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for entries in SIZES:
+            path = os.path.join(directory, f'scores-{entries}.txt')
+            write_journal(path, entries)
+            _, scan = timed(lambda: ScoreStore(path).close())
+            store, indexed = timed(lambda: ScoreStore(path))
+            _, add = timed(lambda: store.add(250, 'bench'))
+            start = time.perf_counter()
+            for _ in range(1000):
+                store.top()
+            top = (time.perf_counter() - start) * 1000
+            assert os.path.exists(index_path(path))
+            print(f"{entries:>10} {scan:>10.1f} {indexed:>11.2f} {add:>8.2f} {top:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
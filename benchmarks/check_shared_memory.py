@@ -0,0 +1,114 @@
+"""Stress the lock-free shared-memory handoffs between processes.
+
+A stand-in writer process drives each structure as fast as it can while
+this process reads:
+
+- FrameRing: every frame is filled with one byte value derived from its
+  sequence number. The reader holds each slot for a while, as inference
+  does, and checks that every frame it gets is uniform and matches its
+  sequence number (no torn or reused frames).
+- GestureChannel: every gesture carries its sequence number in its
+  timestamps and gesture code. The reader checks that each event it gets
+  is consistent and that sequence numbers only go up (no torn or stale
+  slots).
+
+Exits non-zero on any bad read.
+
+Run from the repository root: python benchmarks/check_shared_memory.py
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_ring import FrameRing, SharedFrameSource  # noqa: E402
+from gesture_channel import GestureChannel, GESTURES, CAPACITY  # noqa: E402
+
+
+def frame_writer(ring_name, frames, interval):
+    ring = FrameRing.attach(ring_name)
+    try:
+        for seq in range(1, frames + 1):
+            slot, view = ring.acquire()
+            view[...] = seq % 251
+            ring.publish(slot, time.monotonic())
+            time.sleep(interval)
+    finally:
+        ring.close_stream()
+        ring.close()
+
+
+def gesture_writer(channel_name, gestures):
+    channel = GestureChannel.attach(channel_name)
+    try:
+        for seq in range(1, gestures + 1):
+            channel.publish(GESTURES[seq % len(GESTURES)], timestamp=float(seq), inferred=float(seq))
+    finally:
+        channel.close()
+
+
+def check_frames(context, frames, interval, hold):
+    ring = FrameRing.create()
+    writer = context.Process(target=frame_writer, args=(ring.name, frames, interval))
+    writer.start()
+    source = SharedFrameSource(ring)
+    read = bad = 0
+    while True:
+        frame, _ = source.read()
+        if frame is None:
+            break
+        value = int(frame.flat[0])
+        time.sleep(hold)  # Hold the slot while the writer keeps going
+        if value != source.frames_captured % 251 or not (frame == value).all():
+            bad += 1
+        read += 1
+        del frame
+    writer.join()
+    source.stop()
+    ring.close()
+    print(f"frame ring: {read} frames read, {source.frames_dropped} skipped, {bad} bad")
+    return bad
+
+
+def check_gestures(context, gestures, capacity):
+    channel = GestureChannel.create(capacity=capacity)
+    writer = context.Process(target=gesture_writer, args=(channel.name, gestures))
+    writer.start()
+    read = bad = 0
+    last = 0
+    while writer.is_alive() or last < gestures:
+        event = channel.read_event()
+        if event is None:
+            if not writer.is_alive() and channel.read_event() is None:
+                break
+            continue
+        seq = event.seq
+        if (seq <= last or event.timestamp != seq or event.inferred != seq
+                or event.gesture != GESTURES[seq % len(GESTURES)]):
+            bad += 1
+        last = seq
+        read += 1
+    writer.join()
+    channel.close()
+    print(f"gesture channel: {read} of {gestures} gestures read, {bad} bad")
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=3000, help="frames to pass through the ring")
+    parser.add_argument('--interval', type=float, default=0.0005, help="seconds between frames from the writer")
+    parser.add_argument('--hold', type=float, default=0.002, help="seconds the reader holds each frame")
+    parser.add_argument('--gestures', type=int, default=200_000, help="gestures to pass through the channel")
+    parser.add_argument('--capacity', type=int, default=CAPACITY, help="channel slots; fewer make the writer lap the reader more often")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    bad = check_frames(context, args.frames, args.interval, args.hold) + check_gestures(context, args.gestures, args.capacity)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Check that the launcher's Supervisor blocks instead of polling.
+
+Runs two stand-in workers: one reports ready and exits cleanly at once, the
+other stays up for a couple of seconds. While the second one runs the
+supervisor should be asleep in ``wait``: the first worker's exit is
+reported once, and the supervisor uses next to no CPU.
+
+Run from the repository root: python benchmarks/check_supervisor.py
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from launcher import Supervisor, Worker  # noqa: E402
+
+RUN_SECONDS = 2.0
+MAX_CPU_SECONDS = 0.2
+
+
+def quits_at_once(ready):
+    ready()
+
+
+def keeps_running(ready):
+    ready()
+    time.sleep(RUN_SECONDS)
+
+
+def main():
+    supervisor = Supervisor([Worker('quick', quits_at_once), Worker('slow', keeps_running)])
+    output = io.StringIO()
+    start, cpu_start = time.monotonic(), time.process_time()
+    try:
+        with contextlib.redirect_stdout(output):
+            supervisor.run()
+    finally:
+        supervisor.stop()
+    elapsed, cpu = time.monotonic() - start, time.process_time() - cpu_start
+
+    lines = output.getvalue().splitlines()
+    print('\n'.join(lines))
+    print(f"supervisor ran {elapsed:.2f} s using {cpu:.3f} s of CPU")
+    assert lines.count("quick exited") == 1, f"'quick exited' reported {lines.count('quick exited')} times"
+    assert lines.count("slow exited") == 1
+    assert elapsed >= RUN_SECONDS, "returned before the running worker exited"
+    assert cpu < MAX_CPU_SECONDS, "supervisor was busy while a worker ran"
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
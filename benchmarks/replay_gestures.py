@@ -0,0 +1,145 @@
+"""Replay recorded hand landmarks through the swipe detector.
+
+Feeds every frame of a recording (see gesture_recording.py) to a
+SwipeDetector as fast as possible, with the recorded timestamps, and reports
+the per-frame cost, the gestures emitted and the detection latency relative
+to the labeled swipe onsets. No camera or display is needed. --batch runs
+the whole recording through SwipeDetector.detect_batch instead of frame by
+frame.
+
+    python benchmarks/replay_gestures.py session.landmarks
+    python benchmarks/replay_gestures.py --synthetic 50 synthetic.landmarks
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gesture_recording import FRAME_DTYPE, labels_path, load_labels, load_recording  # noqa: E402
+from swipe_detector import SwipeDetector  # noqa: E402
+
+# A labeled swipe counts as detected by the first matching gesture within this window
+MATCH_WINDOW = 1.0
+SWIPE_VECTORS = {'LEFT': (-1, 0), 'RIGHT': (1, 0), 'UP': (0, -1), 'DOWN': (0, 1)}
+
+
+def make_synthetic_recording(path, swipes, fps=30, seed=0):
+    """Write a recording of a hand jittering at rest with ``swipes`` labeled swipes.
+
+    Each swipe moves the fingertips 0.36 of the frame width or height over
+    three frames and returns slowly; swipes are 2 s apart to clear the detector
+    cooldowns. Every tenth second the hand leaves the frame for a few frames.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(SWIPE_VECTORS)
+    frames_per_swipe = 2 * fps
+    frames = np.zeros(swipes * frames_per_swipe, dtype=FRAME_DTYPE)
+    frames['time'] = np.arange(len(frames)) / fps
+    position = np.full((len(frames), 2), 0.5)
+    labels = []
+    for i in range(swipes):
+        name = names[rng.integers(len(names))]
+        vx, vy = SWIPE_VECTORS[name]
+        onset = i * frames_per_swipe + fps // 2
+        move = np.linspace(0, 0.36, 4)[1:]
+        back = np.linspace(0.36, 0, fps)
+        span = np.concatenate([move, back])
+        position[onset:onset + len(span), 0] += vx * span
+        position[onset:onset + len(span), 1] += vy * span
+        labels.append((float(frames['time'][onset - 1]), name))  # Last frame at rest
+    position += rng.normal(0, 0.003, position.shape)
+    frames['landmarks'][:, :, 0] = position[:, :1]
+    frames['landmarks'][:, :, 1] = position[:, 1:]
+    gaps = np.arange(len(frames)) % (10 * fps) < 3
+    frames['landmarks'][gaps] = np.nan
+    frames.tofile(path)
+    with open(labels_path(path), 'w', newline='') as file:
+        csv.writer(file).writerows(labels)
+
+
+def replay(path):
+    """Feed the frames one by one; return the frames, per-frame costs (ns), gestures and elapsed time."""
+    frames = load_recording(path)
+    times = frames['time']
+    landmarks = np.ascontiguousarray(frames['landmarks'])
+    present = ~np.isnan(landmarks[:, 0, 0])
+
+    detector = SwipeDetector()
+    costs = []
+    emitted = []
+    start = time.perf_counter()
+    for i in np.flatnonzero(present):
+        hand = landmarks[i]
+        t = float(times[i])
+        t0 = time.perf_counter_ns()
+        gesture = detector.update(hand, t)
+        costs.append(time.perf_counter_ns() - t0)
+        if gesture:
+            emitted.append((t, gesture))
+    elapsed = time.perf_counter() - start
+    return frames, np.array(costs), emitted, elapsed
+
+
+def replay_batch(path):
+    """Run the whole recording through detect_batch; costs are the mean per frame."""
+    frames = load_recording(path)
+    detector = SwipeDetector()
+    start = time.perf_counter()
+    found = detector.detect_batch(frames['time'], frames['landmarks'])
+    elapsed = time.perf_counter() - start
+    emitted = [(float(frames['time'][i]), gesture) for i, gesture in found]
+    with_hand = int(np.count_nonzero(~np.isnan(frames['landmarks'][:, 0, 0])))
+    costs = np.full(with_hand, elapsed * 1e9 / max(with_hand, 1))
+    return frames, costs, emitted, elapsed
+
+
+def match(labels, emitted):
+    """Pair labeled onsets with the first unused matching gesture; return latencies and misses."""
+    used = set()
+    latencies = []
+    missed = 0
+    for onset, name in sorted(labels):
+        for j, (t, gesture) in enumerate(emitted):
+            if j not in used and gesture == name and onset <= t <= onset + MATCH_WINDOW:
+                used.add(j)
+                latencies.append(t - onset)
+                break
+        else:
+            missed += 1
+    return np.array(latencies), missed, len(emitted) - len(used)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('recording')
+    parser.add_argument('--synthetic', type=int, metavar='SWIPES',
+                        help='first write a synthetic recording with this many swipes')
+    parser.add_argument('--batch', action='store_true', help='use SwipeDetector.detect_batch')
+    args = parser.parse_args()
+    if args.synthetic:
+        make_synthetic_recording(args.recording, args.synthetic)
+
+    frames, costs, emitted, elapsed = (replay_batch if args.batch else replay)(args.recording)
+    labels = load_labels(args.recording)
+    print(f"frames:           {len(frames)} ({len(costs)} with a hand)")
+    if len(costs):
+        print(f"replay rate:      {len(costs) / elapsed:,.0f} frames/s")
+        print(f"per-frame cost:   mean {costs.mean() / 1000:.2f} us, "
+              f"p50 {np.percentile(costs, 50) / 1000:.2f} us, p99 {np.percentile(costs, 99) / 1000:.2f} us")
+    counts = {name: sum(1 for _, g in emitted if g == name) for name in SWIPE_VECTORS}
+    print(f"gestures emitted: {len(emitted)} {counts}")
+    if labels:
+        latencies, missed, false_positives = match(labels, emitted)
+        print(f"labeled swipes:   {len(labels)}, detected {len(latencies)}, missed {missed}, "
+              f"false positives {false_positives}")
+        if len(latencies):
+            print(f"latency:          mean {latencies.mean() * 1000:.1f} ms, "
+                  f"p50 {np.percentile(latencies, 50) * 1000:.1f} ms, max {latencies.max() * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Soak test: the autopilot plays games back to back without a display.
+
+Logs ticks per second, games won and lost, and the longest snake every
+--interval seconds. A death means the autopilot trapped itself, which
+should not happen on a board with an even side.
+
+    python benchmarks/soak_autopilot.py --duration 3600
+    python benchmarks/soak_autopilot.py --board 1000x1000 --duration 600 --interval 30
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from autopilot import soak  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--board', default='40x30', help="board size in cells, WIDTHxHEIGHT")
+    parser.add_argument('--duration', type=float, default=60.0, help="seconds to run")
+    parser.add_argument('--interval', type=float, default=10.0, help="seconds between log lines")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    width, height = (int(n) for n in args.board.lower().split('x'))
+    if width % 2 and height % 2:
+        parser.error("the autopilot needs a board with an even width or height")
+    stats = soak(width, height, args.duration, args.interval, args.seed, log=lambda line: print(line, flush=True))
+    return 1 if stats.deaths else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class FrameSource:
+    """Frame counters and ages shared by the frame sources handed to inference.
+
+    Subclasses provide ``frames_captured`` and call ``_took`` with the
+    capture time of every frame they hand out.
+    """
+
+    def __init__(self):
+        self.frames_dropped = 0
+        self.frames_inferred = 0
+        self.total_frame_age = 0.0
+        self.max_frame_age = 0.0
+        self.last_frame_age = 0.0
+
+    def _took(self, capture_time):
+        age = time.monotonic() - capture_time
+        self.frames_inferred += 1
+        self.total_frame_age += age
+        self.max_frame_age = max(self.max_frame_age, age)
+        self.last_frame_age = age
+
+    @property
+    def mean_frame_age(self):
+        return self.total_frame_age / self.frames_inferred if self.frames_inferred else 0.0
+
+    def stats(self):
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped,
+            'frames_inferred': self.frames_inferred,
+            'mean_frame_age_ms': self.mean_frame_age * 1000,
+            'max_frame_age_ms': self.max_frame_age * 1000,
+        }
+
+
+class LatestFrameCapture(FrameSource):
+    """Reads a cv2.VideoCapture on its own thread and keeps only the newest frame.
+
+    The inference loop calls ``read`` whenever it is ready for more work and
+    always gets the most recent frame; frames it was too slow to look at are
+    dropped instead of piling up in the driver buffer.
+
+    Counters:
+        frames_captured  frames read from the camera
+        frames_dropped   frames replaced by a newer one before inference took them
+        frames_inferred  frames handed to inference
+        frame age        time from capture to the moment inference took the frame
+    """
+
+    def __init__(self, cap):
+        super().__init__()
+        self.cap = cap
+        self.frames_captured = 0
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._capture_time = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='frame-capture', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            capture_time = time.monotonic()
+            with self._cond:
+                if self._frame is not None:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._capture_time = capture_time
+                self.frames_captured += 1
+                self._cond.notify()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self):
+        """Wait for a frame newer than the last one read.
+
+        Returns ``(frame, capture_time)``, or ``(None, None)`` once the camera
+        has stopped delivering frames.
+        """
+        with self._cond:
+            while self._frame is None and self._running:
+                self._cond.wait(0.5)
+            frame, capture_time = self._frame, self._capture_time
+            self._frame = None
+        if frame is None:
+            return None, None
+        self._took(capture_time)
+        return frame, capture_time
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
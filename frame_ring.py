@@ -0,0 +1,170 @@
+"""Camera frames passed between processes through shared memory.
+
+The capture process reads the camera straight into one of a few
+preallocated frame slots and publishes it as the latest frame; the
+inference process works on the latest slot in place. Nothing is pickled or
+copied on the way. The writer never reuses the slot a reader has claimed,
+so with three slots it always has one free to write into.
+
+Layout: a control block (latest slot and sequence number, the slot being
+read, a closed flag), one (sequence, capture time) record per slot, then
+the slots themselves. A slot's sequence number is 0 while it is being
+written.
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from frame_capture import FrameSource
+from gesture_channel import attach_untracked
+
+CONTROL = struct.Struct('<qqq')  # latest (seq << 8 | slot, -1 before the first frame), reading slot, closed
+FIELD = struct.Struct('<q')  # One CONTROL field, written on its own so the two sides never clobber each other
+LATEST_OFFSET, READING_OFFSET, CLOSED_OFFSET = 0, 8, 16
+SLOT_META = struct.Struct('<qd')  # seq, capture time
+DEFAULT_SLOTS = 3
+FRAME_SHAPE = (480, 640, 3)  # Camera frames are delivered at this size
+
+
+class FrameRing:
+    """Fixed slots of ``shape`` uint8 frames in a shared-memory segment."""
+
+    def __init__(self, shm, shape, slots, owner):
+        self._shm = shm
+        self.name = shm.name
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._owner = owner
+        self._buf = shm.buf
+        self._seq = 0
+        self._next_slot = 0
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf,
+                                 offset=self.data_offset(slots))
+
+    @staticmethod
+    def data_offset(slots):
+        # Frames start on a cache line
+        return -(-(CONTROL.size + SLOT_META.size * slots) // 64) * 64
+
+    @classmethod
+    def size(cls, shape, slots):
+        return cls.data_offset(slots) + slots * int(np.prod(shape))
+
+    @classmethod
+    def create(cls, shape=FRAME_SHAPE, slots=DEFAULT_SLOTS):
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(shape, slots))
+        ring = cls(shm, shape, slots, owner=True)
+        CONTROL.pack_into(ring._buf, 0, -1, -1, 0)
+        for slot in range(slots):
+            SLOT_META.pack_into(ring._buf, ring._meta_offset(slot), 0, 0.0)
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape=FRAME_SHAPE, slots=DEFAULT_SLOTS):
+        # The creating process owns the segment and unlinks it
+        return cls(attach_untracked(name), shape, slots, owner=False)
+
+    def _meta_offset(self, slot):
+        return CONTROL.size + slot * SLOT_META.size
+
+    def _control(self):
+        return CONTROL.unpack_from(self._buf, 0)
+
+    # Writer side
+
+    def acquire(self):
+        """Pick a slot to write the next frame into; return (slot, frame view)."""
+        for _ in range(2 * self.slots):
+            latest, reading, _ = self._control()
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.slots
+            if latest >= 0 and slot == latest & 0xFF or slot == reading:
+                continue
+            SLOT_META.pack_into(self._buf, self._meta_offset(slot), 0, 0.0)
+            # The reader may have claimed the slot in the meantime; it then sees seq 0 and retries
+            if FIELD.unpack_from(self._buf, READING_OFFSET)[0] != slot:
+                return slot, self.frames[slot]
+        raise RuntimeError("No free frame slot")
+
+    def publish(self, slot, capture_time):
+        self._seq += 1
+        SLOT_META.pack_into(self._buf, self._meta_offset(slot), self._seq, capture_time)
+        FIELD.pack_into(self._buf, LATEST_OFFSET, self._seq << 8 | slot)
+
+    def close_stream(self):
+        """Tell readers no more frames will come."""
+        FIELD.pack_into(self._buf, CLOSED_OFFSET, 1)
+
+    # Reader side
+
+    def read_latest(self, after_seq=0):
+        """Claim the latest frame if it is newer than ``after_seq``.
+
+        Returns (seq, capture time, frame view) or None. The view stays valid
+        until the next call or ``release()``.
+        """
+        latest = FIELD.unpack_from(self._buf, LATEST_OFFSET)[0]
+        if latest < 0 or latest >> 8 <= after_seq:
+            return None
+        slot, seq = latest & 0xFF, latest >> 8
+        FIELD.pack_into(self._buf, READING_OFFSET, slot)
+        slot_seq, capture_time = SLOT_META.unpack_from(self._buf, self._meta_offset(slot))
+        if slot_seq != seq:
+            return None  # Overwritten before it was claimed; a newer frame is on its way
+        return seq, capture_time, self.frames[slot]
+
+    def release(self):
+        FIELD.pack_into(self._buf, READING_OFFSET, -1)
+
+    @property
+    def closed(self):
+        return FIELD.unpack_from(self._buf, CLOSED_OFFSET)[0] == 1
+
+    def close(self):
+        self.frames = None  # Drop the exported view before closing the segment
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SharedFrameSource(FrameSource):
+    """Reads the latest frames from a FrameRing with the interface of LatestFrameCapture.
+
+    The ring has no cross-process wakeup, so ``read`` polls it every
+    ``poll_interval`` seconds (2 ms by default) until a newer frame is
+    published; that interval adds at most as much to the frame age.
+    """
+
+    def __init__(self, ring, poll_interval=0.002):
+        super().__init__()
+        self.ring = ring
+        self.poll_interval = poll_interval
+        self._last_seq = 0
+        self._running = True
+
+    def read(self):
+        """Wait for a frame newer than the last one read; ``(None, None)`` once the stream closed."""
+        while self._running:
+            claimed = self.ring.read_latest(self._last_seq)
+            if claimed:
+                break
+            if self.ring.closed:
+                return None, None
+            time.sleep(self.poll_interval)
+        else:
+            return None, None
+        seq, capture_time, frame = claimed
+        self.frames_dropped += seq - self._last_seq - 1
+        self._last_seq = seq
+        self._took(capture_time)
+        return frame, capture_time
+
+    @property
+    def frames_captured(self):
+        return self._last_seq
+
+    def stop(self):
+        self._running = False
+        self.ring.release()
@@ -1,21 +1,23 @@
 import pygame
-import random
 import threading
-import HandGesture
 import os
-
-# Initialize Pygame and mixer for sounds
-pygame.init()
-pygame.mixer.init()
-
-# Load sound effect
-eat_sound = pygame.mixer.Sound(os.path.join('assets', 'eat_sound.wav'))
+import atexit
+import functools
+import time
+import snake_engine
+from asset_cache import assets
+from renderer import FullRenderer, DirtyRectRenderer
+from scores import ScoreWriter
+from screens import Screen, Button, Label
+from latency import LatencyTracker
+from autopilot import Autopilot, SoakStats
+from profiler import profiler, PROFILE_ENV
+from gesture_channel import GestureChannel, CHANNEL_ENV
+from gesture_process import GestureProcesses
 
 # Game display dimensions
 DIS_WIDTH = 800
 DIS_HEIGHT = 600
-dis = pygame.display.set_mode((DIS_WIDTH, DIS_HEIGHT))
-pygame.display.set_caption('Enhanced Snake Game with Hand Gestures')
 
 # Colors
 WHITE = (255, 255, 255)
@@ -28,184 +30,283 @@ YELLOW = (255, 255, 102)
 # Game clock
 clock = pygame.time.Clock()
 SNAKE_BLOCK = 20
-SNAKE_SPEED = 5
-
-# Font settings
-font_style = pygame.font.SysFont("bahnschrift", 30)
-score_font = pygame.font.SysFont("comicsansms", 35)
-
-# Load assets
-food_size = 50
-try:
-    apple_image = pygame.image.load(os.path.join('assets', 'apple.png'))
-    apple_image = pygame.transform.scale(apple_image, (food_size, food_size))
-except pygame.error:
-    apple_image = None
-    print("Error loading apple image")
-
-background_image = pygame.image.load('game_background.png')
-background_image = pygame.transform.scale(background_image, (DIS_WIDTH, DIS_HEIGHT))
-
-# Start gesture detection in a separate thread
-gesture_thread = threading.Thread(target=HandGesture.start_gesture_detection, daemon=True)
-gesture_thread.start()
-
-# Function to read hand gestures from file
-def read_gesture():
+SNAKE_SPEED = snake_engine.START_SPEED
+
+# The simulation ticks at the snake's speed; events, gestures and drawing run at RENDER_FPS
+RENDER_FPS = 60
+MAX_CATCH_UP_TICKS = 5
+
+# Pending gesture turns: at most TURN_QUEUE_SIZE are buffered, one is applied per tick,
+# and turns still waiting after TURN_MAX_AGE seconds are dropped
+TURN_QUEUE_SIZE = 3
+TURN_MAX_AGE = float(os.environ.get('SNAKE_TURN_MAX_AGE', '0.6'))
+
+# Board size in cells: the screen by default. SNAKE_BOARD=<width>x<height> (e.g. 1000x1000)
+# plays on a bigger board, and the view scrolls with the head
+BOARD_SIZE = os.environ.get('SNAKE_BOARD')
+if BOARD_SIZE:
+    GRID_WIDTH, GRID_HEIGHT = (int(n) for n in BOARD_SIZE.lower().split('x'))
+else:
+    GRID_WIDTH = DIS_WIDTH // SNAKE_BLOCK
+    GRID_HEIGHT = DIS_HEIGHT // SNAKE_BLOCK
+
+food_size = SNAKE_BLOCK  # Food sits on one snake cell
+
+# Rendering mode: 'dirty' repaints only the changed parts of the screen, 'full' redraws everything
+RENDER_MODE = os.environ.get('SNAKE_RENDER', 'dirty')
+renderer_class = DirtyRectRenderer if RENDER_MODE == 'dirty' else FullRenderer
+
+# Display, fonts, assets, the gesture channel and the score writer are set up by
+# setup() on the first game, so importing this module (e.g. from menu.py) is cheap
+dis = None
+font_style = None
+score_font = None
+overlay_font = None
+eat_sound = None
+renderer = None
+gesture_channel = None
+gesture_thread = None
+gesture_processes = None
+gesture_stop = threading.Event()
+score_writer = None
+
+# SNAKE_AUTOPILOT=1 lets the autopilot (autopilot.py) steer instead of hand gestures, for soak
+# tests: no camera is opened, games restart on their own without touching the high scores,
+# and ticks per second and the longest snake are printed every AUTOPILOT_LOG_INTERVAL seconds
+AUTOPILOT = os.environ.get('SNAKE_AUTOPILOT', '0') == '1'
+AUTOPILOT_LOG_INTERVAL = 10.0
+autopilot = None
+soak_stats = None
+
+def setup():
+    global dis, font_style, score_font, overlay_font, eat_sound, renderer, score_writer, autopilot, soak_stats
+    if renderer is not None:
+        return
+    pygame.init()
+    pygame.mixer.init()
+    dis = pygame.display.set_mode((DIS_WIDTH, DIS_HEIGHT))
+    pygame.display.set_caption('Enhanced Snake Game with Hand Gestures')
+
+    # Font settings
+    font_style = pygame.font.SysFont("bahnschrift", 30)
+    score_font = pygame.font.SysFont("comicsansms", 35)
+    overlay_font = pygame.font.SysFont(None, 20)
+
+    # Load assets
+    eat_sound = assets.sound(os.path.join('assets', 'eat_sound.wav'))
     try:
-        with open('gesture.txt', 'r+') as f:
-            gesture = f.read().strip()
-            if gesture:
-                f.seek(0)
-                f.truncate()
-            return gesture
-    except FileNotFoundError:
-        return ''
-
-# Display score
-def show_score(score):
-    # Render the score on the screen
-    value = score_font.render(f"Score: {score}", True, YELLOW)
-    dis.blit(value, [0, 0])
-
-    # Write the score to 'high_scores.txt'
-    with open('high_scores.txt', 'w') as file:
-        file.write(f" {score}\n")
-
-# Draw snake on the screen
-def draw_snake(snake_blocks):
-    for i, block in enumerate(snake_blocks):
-        x, y = block
-        if i == 0:  # Draw the head
-            pygame.draw.rect(dis, GREEN, [x, y, SNAKE_BLOCK, SNAKE_BLOCK])
-        else:  # Draw the body
-            pygame.draw.rect(dis, BLUE, [x, y, SNAKE_BLOCK, SNAKE_BLOCK])
-
-# Function to show messages
-def message(msg, color, x, y):
-    mesg = font_style.render(msg, True, color)
-    dis.blit(mesg, [x, y])
-
-# Draw button with text
-def draw_button(screen, msg, color, font, button_rect):
-    pygame.draw.rect(screen, WHITE, button_rect)
-    pygame.draw.rect(screen, BLACK, button_rect, 3)
-    text_surface = font.render(msg, True, color)
-    text_rect = text_surface.get_rect(center=button_rect.center)
-    screen.blit(text_surface, text_rect)
-
-# Game over screen with option to return to the menu
+        apple_image = assets.image(os.path.join('assets', 'apple.png'), (food_size, food_size), alpha=True)
+    except pygame.error:
+        apple_image = None
+        print("Error loading apple image")
+    background_image = assets.image('game_background.png', (DIS_WIDTH, DIS_HEIGHT))
+    renderer = renderer_class(dis, background_image, apple_image, SNAKE_BLOCK, (GREEN, BLUE, RED))
+
+    if AUTOPILOT:
+        autopilot = Autopilot(GRID_WIDTH, GRID_HEIGHT)
+        soak_stats = SoakStats(AUTOPILOT_LOG_INTERVAL)
+    else:
+        start_gesture_detection()
+
+    # Final scores are appended to the 'high_scores.txt' journal by a background writer
+    score_writer = ScoreWriter()
+    atexit.register(score_writer.close)
+
+# Gesture channel: launcher.py runs the detector in its own process and passes the
+# channel name in the environment. Otherwise SNAKE_GESTURE_PROCESS=1 runs capture and
+# inference in worker processes (frames in shared memory), and by default gesture
+# detection runs in a separate thread
+GESTURE_PROCESS = os.environ.get('SNAKE_GESTURE_PROCESS', '0') == '1'
+
+def start_gesture_detection():
+    global gesture_channel, gesture_thread, gesture_processes
+    if os.environ.get(CHANNEL_ENV):
+        gesture_channel = GestureChannel.attach()
+    elif GESTURE_PROCESS:
+        gesture_channel = GestureChannel.create()
+        gesture_processes = GestureProcesses(gesture_channel)
+        gesture_processes.start()
+    else:
+        import HandGesture  # Loads MediaPipe; only needed when the detector runs in this process
+        gesture_channel = GestureChannel.create()
+        gesture_thread = threading.Thread(target=HandGesture.start_gesture_detection,
+                                          args=(gesture_channel,), kwargs={'stop_event': gesture_stop},
+                                          name='gesture-detection', daemon=True)
+        gesture_thread.start()
+    atexit.register(stop_gesture_detection)
+
+def stop_gesture_detection():
+    gesture_stop.set()
+    if gesture_thread:
+        gesture_thread.join(timeout=1.0)
+    if gesture_processes:
+        gesture_processes.stop()
+    gesture_channel.close()
+
+# Function to read the next hand gesture event from the shared-memory channel (None if there is none)
+def read_gesture():
+    return gesture_channel.read_event()
+
+# Gesture latency instrumentation: SNAKE_LATENCY_JSON=<path> dumps the per-stage
+# histograms at exit, SNAKE_LATENCY_OVERLAY=1 shows them on screen
+latency_tracker = LatencyTracker()
+LATENCY_JSON = os.environ.get('SNAKE_LATENCY_JSON')
+LATENCY_OVERLAY = os.environ.get('SNAKE_LATENCY_OVERLAY', '0') == '1'
+if LATENCY_JSON:
+    atexit.register(latency_tracker.dump, LATENCY_JSON)
+
+# Render text lines into one surface for debug overlays
+def render_overlay(lines):
+    rendered = [overlay_font.render(line, True, WHITE, BLACK) for line in lines]
+    surface = pygame.Surface((max(r.get_width() for r in rendered), sum(r.get_height() for r in rendered)))
+    y = 0
+    for r in rendered:
+        surface.blit(r, (0, y))
+        y += r.get_height()
+    return surface
+
+# The latency overlay is re-rendered only when a new gesture was recorded
+@functools.lru_cache(maxsize=1)
+def render_latency_overlay(recorded):
+    return render_overlay(latency_tracker.summary_lines())
+
+# Profiling: SNAKE_PROFILE=1 shows per-stage frame times, refreshed twice a second;
+# SNAKE_PROFILE_TRACE=<path> writes a Chrome trace at exit (see profiler.py)
+PROFILE_HUD = os.environ.get(PROFILE_ENV, '0') == '1'
+PROFILE_HUD_INTERVAL = 0.5
+
+@functools.lru_cache(maxsize=1)
+def render_profile_overlay(period, recorded):
+    lines = profiler.summary_lines()
+    if LATENCY_OVERLAY:
+        lines += latency_tracker.summary_lines()
+    return render_overlay(lines or ["Profiling..."])
+
+# Overlay for this frame, or None when no debug overlay is on
+def debug_overlay():
+    if PROFILE_HUD:
+        return render_profile_overlay(int(time.monotonic() / PROFILE_HUD_INTERVAL), latency_tracker.recorded)
+    if LATENCY_OVERLAY:
+        return render_latency_overlay(latency_tracker.recorded)
+    return None
+
+# Render the score text; the surface is cached until the score changes
+@functools.lru_cache(maxsize=1)
+def render_score(score):
+    return score_font.render(f"Score: {score}", True, YELLOW)
+
+# Game over screen with option to return to the menu; drawn only when it opens
+class GameOverScreen(Screen):
+    def __init__(self):
+        def button(text, y, value):
+            return Button(text, (DIS_WIDTH // 3, y, 200, 50), font_style, WHITE, WHITE, BLACK, value, border=(BLACK, 3))
+        super().__init__(dis, [
+            button("Play Again", DIS_HEIGHT // 2 - 80, 'play_again'),
+            button("Menu", DIS_HEIGHT // 2, 'menu'),
+            button("Quit", DIS_HEIGHT // 2 + 80, 'quit'),
+        ])
+        self.title = Label("Game Over!", font_style, RED, (DIS_WIDTH // 3, DIS_HEIGHT // 4), anchor='topleft')
+
+    def draw(self):
+        self.surface.fill(BLACK)
+        self.title.draw(self.surface)
+        super().draw()
+
+game_over_screen = None
+
 def game_over_menu():
-    while True:
-        dis.fill(BLACK)
-        message("Game Over!", RED, DIS_WIDTH // 3, DIS_HEIGHT // 4)
-        
-        # Define buttons
-        play_again_button = pygame.Rect(DIS_WIDTH // 3, DIS_HEIGHT // 2 - 80, 200, 50)
-        menu_button = pygame.Rect(DIS_WIDTH // 3, DIS_HEIGHT // 2, 200, 50)
-        quit_button = pygame.Rect(DIS_WIDTH // 3, DIS_HEIGHT // 2 + 80, 200, 50)
-
-        draw_button(dis, "Play Again", BLACK, font_style, play_again_button)
-        draw_button(dis, "Menu", BLACK, font_style, menu_button)
-        draw_button(dis, "Quit", BLACK, font_style, quit_button)
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if play_again_button.collidepoint(event.pos):
-                    return 'play_again'
-                elif menu_button.collidepoint(event.pos):
-                    return 'menu'
-                elif quit_button.collidepoint(event.pos):
-                    pygame.quit()
-                    exit()
+    global game_over_screen
+    if game_over_screen is None:
+        game_over_screen = GameOverScreen()
+    choice = game_over_screen.run()
+    if choice == 'quit':
+        pygame.quit()
+        exit()
+    return choice
 
 # Game Loop
 def game_loop():
-    global SNAKE_SPEED
+    setup()
     while True:
-        x, y = DIS_WIDTH // 2, DIS_HEIGHT // 2
-        x_change, y_change = 0, 0
-
-        snake_blocks = []
-        snake_length = 1
-
-        foodx = round(random.randrange(0, DIS_WIDTH - food_size) / 10.0) * 10.0
-        foody = round(random.randrange(0, DIS_HEIGHT - food_size) / 10.0) * 10.0
-
-        direction = 'RIGHT'
-        gesture_cooldown = 3
-        gesture_timer = 0
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
-
-            # Handle hand gestures
-            if gesture_timer == 0:
-                gesture = read_gesture()
-                if gesture == "LEFT" and direction != 'RIGHT':
-                    x_change = -SNAKE_BLOCK
-                    y_change = 0
-                    direction = 'LEFT'
-                elif gesture == "RIGHT" and direction != 'LEFT':
-                    x_change = SNAKE_BLOCK
-                    y_change = 0
-                    direction = 'RIGHT'
-                elif gesture == "UP" and direction != 'DOWN':
-                    x_change = 0
-                    y_change = -SNAKE_BLOCK
-                    direction = 'UP'
-                elif gesture == "DOWN" and direction != 'UP':
-                    x_change = 0
-                    y_change = SNAKE_BLOCK
-                    direction = 'DOWN'
-                gesture_timer = gesture_cooldown
-            else:
-                gesture_timer -= 1
-
-            # Update snake position
-            x += x_change
-            y += y_change
-
-            # Check for collisions with walls or itself
-            if x >= DIS_WIDTH or x < 0 or y >= DIS_HEIGHT or y < 0:
+        state = snake_engine.new_state(GRID_WIDTH, GRID_HEIGHT, speed=SNAKE_SPEED)
+        renderer.reset()
+
+        # Turns that never get applied still count in the latency histograms as dropped
+        turn_queue = snake_engine.TurnQueue(TURN_QUEUE_SIZE, TURN_MAX_AGE,
+                                            on_drop=lambda turn: latency_tracker.record(*turn.payload, None))
+
+        if autopilot:
+            autopilot.reset()
+        ticks = 0
+
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        game_over = False
+
+        while not game_over:
+            with profiler.stage('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        pygame.quit()
+                        exit()
+
+            # Queue every hand gesture as soon as it arrives; the autopilot steers each tick instead
+            if autopilot is None:
+                with profiler.stage('read_gesture'):
+                    gesture_event = read_gesture()
+                    while gesture_event:
+                        # Age is counted from capture, so gestures left over from the menu or
+                        # the game-over screen expire instead of turning the new snake
+                        consumed = time.monotonic()
+                        turn_queue.push(gesture_event.gesture, gesture_event.timestamp, snake_engine.heading(state),
+                                        (gesture_event, consumed))
+                        gesture_event = read_gesture()
+
+            # Advance the simulation by fixed ticks of 1 / speed seconds
+            with profiler.stage('simulate'):
+                now = time.perf_counter()
+                accumulator = min(accumulator + now - last_time, MAX_CATCH_UP_TICKS / state.speed)
+                last_time = now
+                while accumulator >= 1 / state.speed:
+                    accumulator -= 1 / state.speed
+
+                    # Apply at most one queued turn per tick
+                    if autopilot:
+                        snake_engine.turn(state, autopilot.next_move(state))
+                    else:
+                        turn = turn_queue.pop(time.monotonic(), snake_engine.heading(state))
+                        if turn:
+                            applied = time.monotonic() if snake_engine.turn(state, turn.direction) else None
+                            latency_tracker.record(*turn.payload, applied)
+
+                    # Walls and the snake itself end the game, and so does a full board (no food left)
+                    result = snake_engine.step(state)
+                    ticks += 1
+                    if result == snake_engine.DIED or state.food is None:
+                        if not autopilot:
+                            score_writer.record(state.score)
+                        game_over = True
+                        break
+                    renderer.tick(state)
+                    if result == snake_engine.ATE:
+                        eat_sound.play()
+            if game_over:
                 break
 
-            dis.blit(background_image, (0, 0))
-            if apple_image:
-                dis.blit(apple_image, (foodx, foody))
-            else:
-                pygame.draw.rect(dis, RED, [foodx, foody, food_size, food_size])
-
-            snake_head = [x, y]
-            snake_blocks.append(snake_head)
-            if len(snake_blocks) > snake_length:
-                del snake_blocks[0]
-
-            for block in snake_blocks[:-1]:
-                if block == snake_head:
-                    break
-
-            draw_snake(snake_blocks)
-            show_score(snake_length - 1)
-            pygame.display.update()
-
-            # Check if snake eats the food
-            if (x >= foodx and x < foodx + food_size) and (y >= foody and y < foody + food_size):
-                foodx = round(random.randrange(0, DIS_WIDTH - food_size) / 10.0) * 10.0
-                foody = round(random.randrange(0, DIS_HEIGHT - food_size) / 10.0) * 10.0
-                snake_length += 1
-                eat_sound.play()
-                SNAKE_SPEED = min(SNAKE_SPEED + 0.2, 15)
-
-            clock.tick(SNAKE_SPEED)
+            # Draw the snake part of the way to its next tick
+            with profiler.stage('render'):
+                renderer.draw(state, render_score(state.score), debug_overlay(), accumulator * state.speed)
+
+            with profiler.stage('idle'):
+                clock.tick(RENDER_FPS)
+            profiler.frame()
+            if soak_stats:
+                soak_stats.maybe_log(ticks, len(state.body))
+
+        # Autopilot games start over right away
+        if soak_stats:
+            soak_stats.game_over(state, ticks)
+            continue
 
         # Handle game over menu
         choice = game_over_menu()
@@ -0,0 +1,132 @@
+import os
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+# Name of the environment variable used to hand the channel name to child processes
+CHANNEL_ENV = 'SNAKE_GESTURE_CHANNEL'
+DEFAULT_CHANNEL_NAME = 'snake_gestures'
+
+# Gesture codes stored in the ring buffer (0 means "no gesture")
+GESTURES = ('LEFT', 'RIGHT', 'UP', 'DOWN')
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURES, start=1)}
+
+# Shared memory layout:
+#   header: total number of gestures ever published (uint64)
+#   slots:  sequence number (uint64, 0 while the slot is being written), capture,
+#           inference-done and publish timestamps (float64, time.monotonic), gesture code (uint8)
+HEADER = struct.Struct('<Q')
+SLOT = struct.Struct('<QdddB7x')
+SEQ = struct.Struct('<Q')  # A slot's sequence number on its own
+PAYLOAD = struct.Struct('<dddB7x')  # The rest of the slot, after SEQ
+CAPACITY = 16
+
+# timestamp is the capture time of the frame the gesture was detected on
+GestureEvent = namedtuple('GestureEvent', ['seq', 'timestamp', 'inferred', 'published', 'gesture'])
+
+
+def attach_untracked(name):
+    """Attach to an existing segment without letting this process' resource tracker unlink it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        pass
+    # Skip the registration instead of undoing it afterwards: a spawned child shares its
+    # parent's tracker, and unregistering there would drop the creator's registration too
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class GestureChannel:
+    """Single-producer ring buffer of gestures living in shared memory.
+
+    The detector publishes gestures with ``publish`` and the game polls them
+    with ``read_event``. Every slot carries the sequence number it was written with,
+    used as a seqlock: the writer sets it to 0, writes the payload, then
+    stores the new number, and a reader takes the payload only if the number
+    is the one it expects both before and after reading it. So a reader
+    never takes a stale or half-written slot and needs no locking, and a
+    burst of swipes is queued instead of overwritten.
+    """
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._buf = shm.buf
+        self._owner = owner
+        self._next_seq = HEADER.unpack_from(self._buf, 0)[0] + 1
+
+    @classmethod
+    def create(cls, name=None, capacity=CAPACITY):
+        size = HEADER.size + SLOT.size * capacity
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a run that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name=None):
+        if name is None:
+            name = os.environ.get(CHANNEL_ENV, DEFAULT_CHANNEL_NAME)
+        return cls(attach_untracked(name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def capacity(self):
+        return (len(self._buf) - HEADER.size) // SLOT.size
+
+    def _slot_offset(self, seq):
+        return HEADER.size + SLOT.size * (seq % self.capacity)
+
+    def publish(self, gesture, timestamp=None, inferred=None):
+        """Append a gesture to the ring; only one process may publish."""
+        published = time.monotonic()
+        if timestamp is None:
+            timestamp = published
+        if inferred is None:
+            inferred = published
+        seq = HEADER.unpack_from(self._buf, 0)[0] + 1
+        offset = self._slot_offset(seq)
+        SEQ.pack_into(self._buf, offset, 0)
+        PAYLOAD.pack_into(self._buf, offset + SEQ.size, timestamp, inferred, published, GESTURE_CODES[gesture])
+        SEQ.pack_into(self._buf, offset, seq)
+        # Bump the head last so readers never see a slot before it is complete
+        HEADER.pack_into(self._buf, 0, seq)
+        return seq
+
+    def read_event(self):
+        """Return the oldest unread gesture as a GestureEvent, or None."""
+        head = HEADER.unpack_from(self._buf, 0)[0]
+        if head < self._next_seq:
+            return None
+        # Skip whatever the writer has already overwritten
+        oldest = max(self._next_seq, head - self.capacity + 1)
+        offset = self._slot_offset(oldest)
+        seq = SEQ.unpack_from(self._buf, offset)[0]
+        timestamp, inferred, published, code = PAYLOAD.unpack_from(self._buf, offset + SEQ.size)
+        if seq != oldest or SEQ.unpack_from(self._buf, offset)[0] != seq:
+            # The writer lapped us while reading; resynchronise on the next poll
+            self._next_seq = head - self.capacity + 2
+            return None
+        self._next_seq = oldest + 1
+        return GestureEvent(seq, timestamp, inferred, published, GESTURES[code - 1])
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,81 @@
+"""Gesture detection in worker processes instead of a thread of the game.
+
+A capture process reads the camera straight into a shared-memory FrameRing
+and an inference process runs the HandGesture loop on those frames in
+place. Only gesture records come back to the game, over the GestureChannel,
+so the game process keeps its interpreter to itself and its frame pacing
+does not depend on how busy inference is.
+"""
+import multiprocessing
+import time
+
+import numpy as np
+
+from frame_ring import FrameRing, SharedFrameSource, FRAME_SHAPE, DEFAULT_SLOTS
+from gesture_channel import GestureChannel
+
+
+def capture_main(ring_name, shape, slots, camera, stop_event):
+    import cv2
+    ring = FrameRing.attach(ring_name, shape, slots)
+    cap = cv2.VideoCapture(camera)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, shape[1])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, shape[0])
+    try:
+        while not stop_event.is_set():
+            slot, view = ring.acquire()
+            # Decode straight into the slot when the camera delivers the ring's frame size
+            ret, frame = cap.read(view)
+            if not ret:
+                break
+            capture_time = time.monotonic()
+            if not np.shares_memory(frame, view):
+                if frame.shape == view.shape:
+                    view[...] = frame
+                else:
+                    cv2.resize(frame, (shape[1], shape[0]), dst=view)
+            ring.publish(slot, capture_time)
+    finally:
+        ring.close_stream()
+        cap.release()
+        ring.close()
+
+
+def inference_main(channel_name, ring_name, shape, slots, stop_event):
+    import HandGesture  # Loads the MediaPipe model in this process only
+    channel = GestureChannel.attach(channel_name)
+    ring = FrameRing.attach(ring_name, shape, slots)
+    try:
+        HandGesture.start_gesture_detection(channel, stop_event=stop_event, frames=SharedFrameSource(ring))
+    finally:
+        channel.close()
+        ring.close()
+
+
+class GestureProcesses:
+    """The capture and inference processes feeding ``channel``, and the frame ring between them."""
+
+    def __init__(self, channel, camera=0, shape=FRAME_SHAPE, slots=DEFAULT_SLOTS):
+        context = multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.ring = FrameRing.create(shape, slots)
+        self.processes = [
+            context.Process(target=capture_main, name='gesture-capture', daemon=True,
+                            args=(self.ring.name, shape, slots, camera, self.stop_event)),
+            context.Process(target=inference_main, name='gesture-inference', daemon=True,
+                            args=(channel.name, self.ring.name, shape, slots, self.stop_event)),
+        ]
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.ring.close()
@@ -0,0 +1,73 @@
+"""Recording of MediaPipe hand landmarks for offline replay.
+
+A recording is a flat binary file of fixed-size records (``FRAME_DTYPE``):
+the capture timestamp followed by the 21 hand landmarks as float32 x, y, z.
+Frames without a hand are stored as NaN so gaps survive the replay. The file
+can be opened with ``np.memmap`` without parsing anything.
+
+Swipe onsets are labeled in a ``<recording>.labels.csv`` sidecar with one
+``time,gesture`` line per swipe; while recording with the debug preview open,
+the keys L, R, U and D add a label at the current frame.
+"""
+import csv
+import os
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FRAME_DTYPE = np.dtype([('time', '<f8'), ('landmarks', '<f4', (NUM_LANDMARKS, 3))])
+LABEL_KEYS = {ord('l'): 'LEFT', ord('r'): 'RIGHT', ord('u'): 'UP', ord('d'): 'DOWN'}
+
+
+def labels_path(path):
+    return path + '.labels.csv'
+
+
+class LandmarkRecorder:
+    """Appends one record per processed frame to ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = 0
+        self._file = open(path, 'ab')
+        self._labels = []
+        self._record = np.zeros(1, dtype=FRAME_DTYPE)
+
+    def add(self, timestamp, landmarks=None):
+        """Record a frame; ``landmarks`` is a (21, 3) array, a MediaPipe landmark list or None."""
+        record = self._record[0]
+        record['time'] = timestamp
+        if landmarks is None:
+            record['landmarks'] = np.nan
+        elif isinstance(landmarks, np.ndarray):
+            record['landmarks'] = landmarks
+        else:
+            record['landmarks'] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+        self._file.write(self._record.tobytes())
+        self.frames += 1
+
+    def label(self, timestamp, gesture):
+        self._labels.append((timestamp, gesture))
+
+    def close(self):
+        self._file.close()
+        if self._labels:
+            with open(labels_path(self.path), 'a', newline='') as file:
+                csv.writer(file).writerows(self._labels)
+
+
+def load_recording(path):
+    """Memory-map a recording as an array of FRAME_DTYPE records."""
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=FRAME_DTYPE)
+    return np.memmap(path, dtype=FRAME_DTYPE, mode='r')
+
+
+def load_labels(path):
+    """Return the labeled swipe onsets of a recording as (time, gesture) pairs."""
+    try:
+        with open(labels_path(path), newline='') as file:
+            return [(float(time), gesture) for time, gesture in csv.reader(file)]
+    except FileNotFoundError:
+        return []
+
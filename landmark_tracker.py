@@ -0,0 +1,159 @@
+"""Adaptive MediaPipe inference with optical-flow tracking in between.
+
+Full hand inference runs every ``k`` frames, or sooner when tracking is
+lost. On the frames in between, the fingertips the swipe detector looks at
+(landmarks 8 and 12) are carried forward with sparse Lucas-Kanade optical
+flow. ``k`` is adjusted from measured costs so that the average processing
+time per frame stays under ``budget`` seconds.
+"""
+import time
+
+import cv2
+import numpy as np
+
+TRACKED_LANDMARKS = (8, 12)
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class AdaptiveInference:
+    """Decides per frame between full inference and tracking, and does the tracking."""
+
+    def __init__(self, budget=0.012, max_interval=6, max_flow_error=20.0):
+        self.budget = budget
+        self.max_interval = max_interval
+        self.max_flow_error = max_flow_error
+        self.interval = 1
+        self.inference_cost = 0.0
+        self.tracking_cost = 0.0
+        self.frames_inferred = 0
+        self.frames_tracked = 0
+        self.tracking_lost = 0
+        self._since_inference = 0
+        self._landmarks = None
+        self._points = None
+        self._prev_gray = None
+
+    def should_infer(self):
+        # One inference every ``interval`` frames
+        return self._landmarks is None or self._since_inference >= self.interval - 1
+
+    def _update_interval(self):
+        # Average cost over an interval of k frames: (inference + (k - 1) * tracking) / k <= budget
+        if self.budget <= self.tracking_cost:
+            self.interval = self.max_interval
+        else:
+            needed = (self.inference_cost - self.tracking_cost) / (self.budget - self.tracking_cost)
+            self.interval = int(min(max(np.ceil(needed), 1), self.max_interval))
+
+    @staticmethod
+    def _smooth(average, sample):
+        return sample if average == 0.0 else 0.8 * average + 0.2 * sample
+
+    def inferred(self, frame, landmarks, cost):
+        """Report a full inference on ``frame``: (21, 3) normalized landmarks or None, taking ``cost`` seconds."""
+        self.frames_inferred += 1
+        self.inference_cost = self._smooth(self.inference_cost, cost)
+        self._update_interval()
+        self._since_inference = 0
+        if landmarks is None:
+            self._landmarks = self._points = self._prev_gray = None
+            return
+        height, width = frame.shape[:2]
+        self._landmarks = landmarks.copy()
+        self._points = (landmarks[list(TRACKED_LANDMARKS), :2] * (width, height)).astype(np.float32).reshape(-1, 1, 2)
+        self._prev_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def track(self, frame):
+        """Carry the fingertips onto ``frame``; return (21, 3) landmarks or None when tracking is lost."""
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        points, status, error = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points, None, **LK_PARAMS)
+        self.tracking_cost = self._smooth(self.tracking_cost, time.perf_counter() - start)
+        self._update_interval()
+
+        if points is None or not status.all() or (error > self.max_flow_error).any():
+            # Low confidence: the caller runs inference on this frame instead
+            self.tracking_lost += 1
+            self._landmarks = None
+            return None
+
+        height, width = frame.shape[:2]
+        self._points = points
+        self._prev_gray = gray
+        self._landmarks[list(TRACKED_LANDMARKS), :2] = points.reshape(-1, 2) / (width, height)
+        self._since_inference += 1
+        self.frames_tracked += 1
+        return self._landmarks
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'frames_inferred': self.frames_inferred,
+            'frames_tracked': self.frames_tracked,
+            'tracking_lost': self.tracking_lost,
+            'inference_ms': self.inference_cost * 1000,
+            'tracking_ms': self.tracking_cost * 1000,
+        }
+
+
+class HandROI:
+    """Region of interest around the last known hand.
+
+    After a hand is found, inference runs on a crop of the frame: the
+    landmark bounding box grown by ``margin`` of its size on every side and
+    at least ``min_size`` of the frame. The box is kept still while the hand
+    stays inside its inner part, so MediaPipe sees a steady image between
+    frames and can keep tracking. Landmarks found in the crop are mapped
+    back to full-frame normalized coordinates; once the hand is lost the
+    caller goes back to the full frame.
+    """
+
+    def __init__(self, margin=0.6, min_size=0.3, inner=0.15):
+        self.margin = margin
+        self.min_size = min_size
+        self.inner = inner
+        self.box = None  # (x0, y0, x1, y1) in pixels
+
+    def crop(self, frame):
+        """Return the part of ``frame`` to run inference on and its box (None for the whole frame)."""
+        if self.box is None:
+            return frame, None
+        x0, y0, x1, y1 = self.box
+        return frame[y0:y1, x0:x1], self.box
+
+    @staticmethod
+    def to_frame(landmarks, box, frame_shape):
+        """Map (21, 3) landmarks normalized to the crop ``box`` back to the full frame."""
+        height, width = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        mapped = landmarks.copy()
+        mapped[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / width
+        mapped[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / height
+        mapped[:, 2] = landmarks[:, 2] * (x1 - x0) / width  # z shares the x scale
+        return mapped
+
+    def update(self, landmarks, frame_shape):
+        """Move the box to full-frame ``landmarks``, or drop it when the hand was lost (None)."""
+        if landmarks is None:
+            self.box = None
+            return
+        height, width = frame_shape[:2]
+        xs, ys = landmarks[:, 0] * width, landmarks[:, 1] * height
+        left, right, top, bottom = xs.min(), xs.max(), ys.min(), ys.max()
+
+        if self.box is not None:
+            # Keep the box while the hand is well inside it
+            x0, y0, x1, y1 = self.box
+            pad_x, pad_y = (x1 - x0) * self.inner, (y1 - y0) * self.inner
+            if x0 + pad_x <= left and right <= x1 - pad_x and y0 + pad_y <= top and bottom <= y1 - pad_y:
+                return
+
+        size = max(right - left, bottom - top) * (1 + 2 * self.margin)
+        size = max(size, self.min_size * min(width, height))
+        cx, cy = (left + right) / 2, (top + bottom) / 2
+        x0 = int(max(cx - size / 2, 0))
+        y0 = int(max(cy - size / 2, 0))
+        x1 = int(min(cx + size / 2, width))
+        y1 = int(min(cy + size / 2, height))
+        self.box = (x0, y0, x1, y1) if x1 > x0 and y1 > y0 else None
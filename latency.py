@@ -0,0 +1,128 @@
+"""Gesture-to-turn latency histograms.
+
+Every gesture carries the time its frame was captured, the time inference
+finished and the time it was published (see gesture_channel.py); the game
+adds when it consumed the gesture and when the turn was applied. The gaps
+between those timestamps are recorded per stage in HDR-style histograms.
+"""
+import json
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations in microseconds, in the style of HdrHistogram.
+
+    Values below 2**SUB_BUCKET_BITS are counted exactly; above that each
+    power of two is split into 2**(SUB_BUCKET_BITS - 1) buckets, so every
+    recorded value is kept to better than 1% relative precision in a fixed
+    amount of memory. Recording is O(1).
+    """
+
+    SUB_BUCKET_BITS = 7
+    MAX_EXPONENT = 40  # Over 12 days in microseconds
+
+    def __init__(self):
+        self._sub_buckets = 1 << self.SUB_BUCKET_BITS
+        self._half = self._sub_buckets >> 1
+        self.counts = [0] * (self._sub_buckets + self.MAX_EXPONENT * self._half)
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self._sub_buckets:
+            return value
+        exponent = value.bit_length() - self.SUB_BUCKET_BITS
+        return self._sub_buckets + (exponent - 1) * self._half + (value >> exponent) - self._half
+
+    def _value(self, index):
+        """Midpoint of the bucket at ``index``."""
+        if index < self._sub_buckets:
+            return index
+        exponent, offset = divmod(index - self._sub_buckets, self._half)
+        exponent += 1
+        return ((offset + self._half) << exponent) + (1 << (exponent - 1))
+
+    def record(self, seconds):
+        value = max(int(seconds * 1_000_000), 0)
+        index = min(self._index(value), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """Value in microseconds at or below which ``percent`` of the records fall."""
+        if not self.total:
+            return 0
+        target = max(1, -(-self.total * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.total if self.total else 0
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'min_us': self.min,
+            'max_us': self.max,
+            'mean_us': round(self.mean, 1),
+            'p50_us': self.percentile(50),
+            'p90_us': self.percentile(90),
+            'p99_us': self.percentile(99),
+            'buckets': {self._value(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+
+# Stages of the gesture path and the timestamps they span
+STAGES = (
+    ('capture_to_inference', 'captured', 'inferred'),
+    ('inference_to_publish', 'inferred', 'published'),
+    ('publish_to_consume', 'published', 'consumed'),
+    ('consume_to_apply', 'consumed', 'applied'),
+    ('end_to_end', 'captured', 'applied'),
+)
+
+
+class LatencyTracker:
+    """Per-stage histograms of the gesture-to-turn path."""
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name, _, _ in STAGES}
+        self.dropped = 0  # Gestures consumed but never applied (e.g. a reversal)
+        self.recorded = 0
+
+    def record(self, event, consumed, applied):
+        """Record a gesture event consumed at ``consumed`` and applied at ``applied`` (None if dropped)."""
+        self.recorded += 1
+        if applied is None:
+            self.dropped += 1
+            return
+        times = {'captured': event.timestamp, 'inferred': event.inferred, 'published': event.published,
+                 'consumed': consumed, 'applied': applied}
+        for name, start, end in STAGES:
+            self.histograms[name].record(times[end] - times[start])
+
+    def to_dict(self):
+        result = {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+        result['dropped'] = self.dropped
+        return result
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def summary_lines(self):
+        """One short line per stage for an on-screen overlay."""
+        lines = []
+        for name, histogram in self.histograms.items():
+            lines.append(f"{name}: p50 {histogram.percentile(50) / 1000:.1f} ms  "
+                         f"p99 {histogram.percentile(99) / 1000:.1f} ms  n={histogram.total}")
+        return lines
@@ -1,79 +1,184 @@
-import subprocess
-import sys
 import os
 import time
-from multiprocessing import Process
+import multiprocessing
+from multiprocessing.connection import wait
+from gesture_channel import GestureChannel, CHANNEL_ENV, DEFAULT_CHANNEL_NAME
 
+# Restart delays for crashed workers: doubled after every crash up to the maximum,
+# and back to the start once a worker has stayed up for STABLE_AFTER seconds
+RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 30.0
+STABLE_AFTER = 10.0
 
-def run_snake_game():
-    try:
-        subprocess.run([sys.executable, "Game.py"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Snake game crashed with error: {e}")
-    except KeyboardInterrupt:
-        print("Snake game stopped by user")
 
+# Worker entry points. Each runs in its own interpreter and calls ready() once it can do its job.
+def run_snake_game(ready):
+    import game
+    game.setup()  # Window up, assets loaded, attached to the gesture channel
+    ready()
+    while game.game_loop() != 'menu':
+        pass
 
-def run_gesture_control():
+
+def run_gesture_control(ready):
+    import HandGesture  # Loads the MediaPipe model
+    channel = GestureChannel.attach()
     try:
-        subprocess.run([sys.executable, "HandGesture.py"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Gesture control crashed with error: {e}")
-    except KeyboardInterrupt:
-        print("Gesture control stopped by user")
+        HandGesture.start_gesture_detection(channel, on_ready=ready)
+    finally:
+        channel.close()
 
 
-def create_gesture_file():
-    # Create the gesture file if it doesn't exist
-    with open('gesture.txt', 'w') as f:
-        f.write('')
+def worker_main(target, conn):
+    try:
+        target(lambda: conn.send('ready'))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+
+
+class Worker:
+    """One supervised component and the state of its current run."""
+
+    def __init__(self, name, target, ends_session=False):
+        self.name = name
+        self.target = target
+        self.ends_session = ends_session  # A clean exit of this worker stops everything
+        self.process = None
+        self.conn = None
+        self.started_at = None
+        self.startup_time = None
+        self.restarts = 0
+        self.backoff = RESTART_BACKOFF
+        self.restart_at = None
+        self.done = False
+
+
+class Supervisor:
+    """Starts the workers directly, waits for them to report ready and restarts them after a crash.
+
+    Worker processes, readiness pipes and the restart timer are all waited on
+    with ``multiprocessing.connection.wait``, so nothing is polled.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        # Spawned workers start from a fresh interpreter, not a fork of this one
+        self.context = multiprocessing.get_context('spawn')
+
+    def start(self, worker):
+        parent_conn, child_conn = self.context.Pipe(duplex=False)
+        worker.process = self.context.Process(target=worker_main, args=(worker.target, child_conn),
+                                              name=worker.name)
+        worker.started_at = time.monotonic()
+        worker.startup_time = None
+        worker.restart_at = None
+        worker.process.start()
+        child_conn.close()  # Keep only the child's end open, so EOF means it exited
+        worker.conn = parent_conn
+
+    def _ready(self, worker):
+        if worker.conn is None:
+            return
+        try:
+            worker.conn.recv()
+        except EOFError:
+            worker.conn.close()
+            worker.conn = None
+            return
+        worker.startup_time = time.monotonic() - worker.started_at
+        print(f"{worker.name} ready in {worker.startup_time:.2f} s")
+
+    def _exited(self, worker):
+        if worker.process is None:
+            return
+        if worker.conn and worker.conn.poll():
+            self._ready(worker)  # It reported ready before exiting
+        worker.process.join()
+        code = worker.process.exitcode
+        uptime = time.monotonic() - worker.started_at
+        if worker.conn:
+            worker.conn.close()
+            worker.conn = None
+        if code == 0:
+            print(f"{worker.name} exited")
+            worker.done = True
+            worker.process = None  # Its sentinel stays ready; waiting on it again would spin
+            return
+        if uptime >= STABLE_AFTER:
+            worker.backoff = RESTART_BACKOFF
+        print(f"{worker.name} crashed (exit code {code}) after {uptime:.1f} s; restarting in {worker.backoff:.1f} s")
+        worker.restart_at = time.monotonic() + worker.backoff
+        worker.backoff = min(worker.backoff * 2, MAX_RESTART_BACKOFF)
+        worker.restarts += 1
+        worker.process = None
+
+    def run(self):
+        for worker in self.workers:
+            self.start(worker)
+        while True:
+            if any(worker.done and worker.ends_session for worker in self.workers):
+                return
+            if all(worker.done for worker in self.workers):
+                return
+            waitables = {}
+            for worker in self.workers:
+                if worker.process:
+                    waitables[worker.process.sentinel] = (self._exited, worker)
+                if worker.conn:
+                    waitables[worker.conn] = (self._ready, worker)
+            restarts = [worker.restart_at for worker in self.workers if worker.restart_at is not None]
+            timeout = max(min(restarts) - time.monotonic(), 0) if restarts else None
+            for ready in wait(list(waitables), timeout):
+                handler, worker = waitables[ready]
+                handler(worker)
+            now = time.monotonic()
+            for worker in self.workers:
+                if worker.restart_at is not None and worker.restart_at <= now:
+                    self.start(worker)
+
+    def stop(self):
+        for worker in self.workers:
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process:
+                worker.process.join()
+
+    def report(self):
+        for worker in self.workers:
+            startup = f"{worker.startup_time:.2f} s" if worker.startup_time is not None else "never ready"
+            print(f"{worker.name}: startup {startup}, restarts {worker.restarts}")
 
 
 def main():
     print("Starting Snake Game with Gesture Controls...")
     print("Press Ctrl+C in this window to quit both programs")
 
-    # Create the gesture file for communication
-    create_gesture_file()
+    # Create the shared-memory gesture channel and tell both programs where to find it
+    channel = GestureChannel.create(DEFAULT_CHANNEL_NAME)
+    os.environ[CHANNEL_ENV] = channel.name
 
-    # Create processes for both programs
-    game_process = Process(target=run_snake_game)
-    gesture_process = Process(target=run_gesture_control)
+    # The game ending ends the session; the gesture worker is restarted if it crashes
+    supervisor = Supervisor([
+        Worker('Snake game', run_snake_game, ends_session=True),
+        Worker('Gesture control', run_gesture_control),
+    ])
 
     try:
-        # Start both processes
-        game_process.start()
-        time.sleep(2)  # Give the game a moment to start
-        gesture_process.start()
-
-        # Keep the main process running
-        while True:
-            if not game_process.is_alive() and not gesture_process.is_alive():
-                print("Both programs have ended")
-                break
-            time.sleep(1)
-
+        supervisor.run()
     except KeyboardInterrupt:
         print("\nShutting down...")
     finally:
-        # Clean up processes
-        if game_process.is_alive():
-            game_process.terminate()
-        if gesture_process.is_alive():
-            gesture_process.terminate()
-
-        # Clean up the gesture file
-        try:
-            os.remove('gesture.txt')
-        except:
-            pass
+        supervisor.stop()
 
-        # Wait for processes to finish
-        game_process.join()
-        gesture_process.join()
+        # Release the gesture channel
+        channel.close()
 
+        supervisor.report()
         print("Successfully shut down all components")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,17 +1,13 @@
 import pygame
 import sys
-import os
+import functools
 import game
-from PIL import Image
-
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init() 
+from asset_cache import assets
+from scores import open_store, TOP_K
+from screens import Screen, Button, Label
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Snake Game')
 
 # Colors
 WHITE = (255, 255, 255)
@@ -21,16 +17,28 @@ RED = (255, 0, 0)
 BUTTON_COLOR = (0, 128, 0)
 HOVER_COLOR = (0, 200, 0)
 
-# Fonts
-font = pygame.font.SysFont('Arial', 40)
-
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
-FPS = 30
-
-# Load and scale the background image
-background_image = pygame.image.load('menu_background.png')  # Use the path to your background image
-background_image = pygame.transform.scale(background_image, (WIDTH, HEIGHT))
+# Instruction animations, scaled to fit GIF_MAX_SIZE
+SWIPE_GIF_PATH = 'assets/swipe.gif'
+SCROLL_GIF_PATH = 'assets/scroll.gif'
+GIF_MAX_SIZE = (400, 300)
+
+# The display, fonts and background are created by setup() when the menu starts
+screen = None
+font = None
+background_image = None
+
+def setup():
+    """Initialize Pygame and load the menu assets."""
+    global screen, font, background_image
+    pygame.init()
+    pygame.mixer.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Snake Game')
+    font = pygame.font.SysFont('Arial', 40)
+    # Scaled once and cached on disk by the asset manager
+    background_image = assets.image('menu_background.png', (WIDTH, HEIGHT))
+    # Decode the instruction animations while the menu is up
+    assets.preload_animations((SWIPE_GIF_PATH, GIF_MAX_SIZE), (SCROLL_GIF_PATH, GIF_MAX_SIZE))
 
 background_music_path = 'assets/background_music.mp3'
 background_music_enabled = True
@@ -53,10 +61,6 @@ def toggle_music():
     else:
         stop_background_music()
 
-# File to store high scores
-HIGH_SCORES_FILE = 'high_scores.txt'
-MAX_HIGH_SCORES = 10
-
 # Game States
 MENU = 'menu'
 GAME = 'game'
@@ -66,300 +70,169 @@ HIGHSCORE = 'highscore'
 EXIT = 'exit'
 current_state = MENU
 
-# Read and write high scores
-def load_high_scores():
-    """Load high scores from the file."""
-    scores = []
-    if not os.path.exists(HIGH_SCORES_FILE):  # Create file if it doesn't exist
-        with open(HIGH_SCORES_FILE, 'w') as file:
-            file.write("")  # Write empty content to create the file
-    else:
-        with open(HIGH_SCORES_FILE, 'r') as file:
-            for line in file:
-                line = line.strip()
-                if line:  # Only process non-empty lines
-                    print(f"Processing line: {line}")  # Debugging: see the content of the line
-                    try:
-                        score = int(line)  # Only store the score as a number
-                        scores.append(score)  # Add valid score to the list
-                    except ValueError:
-                        # Handle lines that don't match the expected format
-                        print(f"Skipping invalid line: {line}")  # Debugging statement
-    # Sort scores in descending order and return the top scores
-    if scores:
-        scores = sorted(scores, reverse=True)  # Sort by score, descending
-        return scores  # Return the sorted list of scores
-    else:
-        return []  # Return an empty list if no scores exist
-
-
-
 
-def save_high_scores(scores):
-    """Save high scores to the file."""
-    with open(HIGH_SCORES_FILE, 'w') as file:
-        for score in scores:
-            file.write(f"{score}\n")  # Save only the score, no player name
+def menu_button(text, x, y, value=None):
+    """A 200x50 menu button with its label rendered once."""
+    return Button(text, (x, y, 200, 50), font, BUTTON_COLOR, HOVER_COLOR, WHITE, value)
 
 
+class MainMenu(Screen):
+    """The main menu with buttons."""
 
-def update_high_scores(new_score, player_name):
-    """Update the list of high scores with a new score."""
-    scores = load_high_scores()
-    scores.append((player_name, new_score))
-    scores = sorted(scores, key=lambda x: x[1], reverse=True)[:MAX_HIGH_SCORES]
-    save_high_scores(scores)
+    def __init__(self):
+        super().__init__(screen, [
+            menu_button("Start Game", WIDTH // 2 - 100, HEIGHT // 2 - 100, GAME),
+            menu_button("Instructions", WIDTH // 2 - 100, HEIGHT // 2 - 30, INSTRUCTIONS),
+            menu_button("Settings", WIDTH // 2 - 100, HEIGHT // 2 + 40, SETTINGS),
+            menu_button("High Scores", WIDTH // 2 - 100, HEIGHT // 2 + 110, HIGHSCORE),
+            menu_button("Exit", WIDTH // 2 - 100, HEIGHT // 2 + 180, EXIT),
+        ])
 
+    def draw(self):
+        self.surface.blit(background_image, (0, 0))
+        super().draw()
 
-def draw_text(text, font, color, surface, x, y):
-    """Draw text on the screen."""
-    text_obj = font.render(text, True, color)
-    text_rect = text_obj.get_rect()
-    text_rect.center = (x, y)
-    surface.blit(text_obj, text_rect)
 
+class SettingsScreen(Screen):
+    """Music toggle and a way back to the menu."""
 
-def draw_button(text, x, y, width, height, color, hover_color):
-    """Draw a button and check if the mouse is hovering over it."""
-    mouse_x, mouse_y = pygame.mouse.get_pos()
-    button_rect = pygame.Rect(x, y, width, height)
+    def __init__(self):
+        self.music_button = menu_button(self.music_text(), WIDTH // 2 - 100, HEIGHT // 2 - 100)
+        # Back button to the bottom right corner, 50 pixels from the right and bottom edges
+        super().__init__(screen, [self.music_button, menu_button("Back", WIDTH - 250, HEIGHT - 100, MENU)])
 
-    # Change button color when hovered
-    if button_rect.collidepoint(mouse_x, mouse_y):
-        pygame.draw.rect(screen, hover_color, button_rect)
-        if pygame.mouse.get_pressed()[0]:  # Left mouse button click
-            return True
-    else:
-        pygame.draw.rect(screen, color, button_rect)
+    @staticmethod
+    def music_text():
+        return "Music: ON" if background_music_enabled else "Music: OFF"
 
-    # Draw button text
-    draw_text(text, font, WHITE, screen, x + width // 2, y + height // 2)
+    def draw(self):
+        self.surface.blit(background_image, (0, 0))
+        super().draw()
 
-    return False
+    def on_click(self, button):
+        if button is self.music_button:
+            toggle_music()
+            self.set_button_text(button, self.music_text())
+            return None
+        return button.value
+
+
+class HighScoreScreen(Screen):
+    """The top high scores from the game."""
+
+    def __init__(self):
+        super().__init__(screen)
+        self.scores = None
+        self.title = Label("High Scores", font, GREEN, (WIDTH // 2, 100))
+        self.footer = Label("Press ESC to return to Menu", font, RED, (WIDTH // 2, HEIGHT - 50))
+        self.rows = []
+
+    def enter(self):
+        # Top entries kept by the score store; the rows are re-rendered only when they changed
+        scores = open_store().top(TOP_K)
+        if scores == self.scores:
+            return
+        self.scores = scores
+        self.rows = []
+        y_position = 200
+        for i, entry in enumerate(scores):  # Display the top 10 scores
+            name = f"{entry.name}  " if entry.name else ""
+            self.rows.append(Label(f"{i + 1}. {name}{entry.score}", font, WHITE, (WIDTH // 2, y_position)))
+            y_position += 40  # Adjust space between scores
+        if not scores:
+            self.rows.append(Label("No high scores yet!", font, WHITE, (WIDTH // 2, y_position)))
+
+    def draw(self):
+        self.surface.fill(BLACK)
+        self.title.draw(self.surface)
+        for row in self.rows:
+            row.draw(self.surface)
+        self.footer.draw(self.surface)
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            return MENU  # Return to the main menu when ESC is pressed
+        return super().handle(event)
+
+
+class InstructionsScreen(Screen):
+    """Instructions with the swipe and scroll GIFs side by side."""
+
+    def __init__(self):
+        super().__init__(screen)
+        self.lines = [
+            Label("Instructions:", font, GREEN, (WIDTH // 2, HEIGHT // 2 + 120)),
+            Label("Use hand gestures to control the snake", font, WHITE, (WIDTH // 2, HEIGHT // 2 + 150)),
+            Label("Swipe to change direction", font, WHITE, (WIDTH // 2, HEIGHT // 2 + 180)),
+            Label("Make sure swipe gestures occur within the camera", font, WHITE, (WIDTH // 2, HEIGHT // 2 + 210)),
+        ]
+        self.frames = None
+
+    def enter(self):
+        # Sprite sheets decoded and scaled once by the asset manager
+        self.swipe_gif = assets.animation(SWIPE_GIF_PATH, GIF_MAX_SIZE)
+        self.scroll_gif = assets.animation(SCROLL_GIF_PATH, GIF_MAX_SIZE)
+        self.start_time = pygame.time.get_ticks()
+
+    def elapsed(self):
+        return pygame.time.get_ticks() - self.start_time
+
+    def update(self):
+        # Redraw when either GIF moves on to its next frame, as its durations call for
+        elapsed = self.elapsed()
+        frames = (self.swipe_gif.frame_at(elapsed), self.scroll_gif.frame_at(elapsed))
+        if frames != self.frames:
+            self.frames = frames
+            self.invalidate()
+
+    def next_frame_ms(self):
+        elapsed = self.elapsed()
+        return min(self.swipe_gif.ms_to_next_frame(elapsed), self.scroll_gif.ms_to_next_frame(elapsed))
+
+    def draw(self):
+        self.surface.fill(BLACK)
+        elapsed = self.elapsed()
+        # Draw the swipe and scroll GIFs at the top
+        self.swipe_gif.draw(self.surface, (WIDTH // 4 - self.swipe_gif.get_width() // 2, 50), elapsed)
+        self.scroll_gif.draw(self.surface, (3 * WIDTH // 4 - self.scroll_gif.get_width() // 2, 50), elapsed)
+        for line in self.lines:
+            line.draw(self.surface)
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            return MENU  # Return to the menu when ESC is pressed
+        return super().handle(event)
+
+
+# Each screen is built once, after setup(), and reused on every visit
+@functools.lru_cache(maxsize=None)
+def get_screen(screen_class):
+    return screen_class()
 
 
 def menu_screen():
     """Display the main menu with buttons."""
-    print("Entering menu screen...")  # Debugging statement
-    while True:
-        screen.fill(BLACK)
-
-        # Draw the background image
-        screen.blit(background_image, (0, 0))
-
-        # Draw menu buttons
-        if draw_button("Start Game", WIDTH // 2 - 100, HEIGHT // 2 - 100, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            print("Start Game clicked!")
-            return GAME  # Update the game state to start the game
-        if draw_button("Instructions", WIDTH // 2 - 100, HEIGHT // 2 - 30, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            print("Instructions clicked!")  # Debugging statement
-            return INSTRUCTIONS
-
-        if draw_button("Settings", WIDTH // 2 - 100, HEIGHT // 2 + 40, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            print("Settings clicked!")  # Debugging statement
-            return SETTINGS
-
-        if draw_button("High Scores", WIDTH // 2 - 100, HEIGHT // 2 + 110, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            print("High Scores clicked!")  # Debugging statement
-            return HIGHSCORE
-
-        if draw_button("Exit", WIDTH // 2 - 100, HEIGHT // 2 + 180, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            print("Exit clicked!")  # Debugging statement
-            return EXIT
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        pygame.display.update()
-        clock.tick(FPS)
-
-
-def game_screen():
-    """The game screen logic, where the actual gameplay happens."""
-    while True:
-        screen.fill(BLACK)
-        # Your game logic here (e.g., displaying the snake and handling movements)
-
-        # Example condition to check if the game is over
-        if game_is_over():  # Replace with your actual game over condition
-            print("Game Over!")  # Debugging statement
-            return MENU  # Transition back to the menu once the game ends
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        pygame.display.update()
-        clock.tick(FPS)       
+    return get_screen(MainMenu).run()
 
 
 def settings_screen():
-    global background_music_enabled
-    while True:
-        screen.fill(BLACK)
-        screen.blit(background_image, (0, 0))
-
-        # Toggle music ON/OFF button
-        music_button_text = "Music: ON" if background_music_enabled else "Music: OFF"
-        if draw_button(music_button_text, WIDTH // 2 - 100, HEIGHT // 2 - 100, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            toggle_music()
+    return get_screen(SettingsScreen).run()
 
-        # Back button to the bottom right corner
-        back_button_x = WIDTH - 250  # Position it 50 pixels from the right edge
-        back_button_y = HEIGHT - 100  # Position it 50 pixels from the bottom edge
-        if draw_button("Back", back_button_x, back_button_y, 200, 50, BUTTON_COLOR, HOVER_COLOR):
-            pygame.event.clear()  # Clear all mouse events before returning to the menu
-            return MENU
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        pygame.display.update()
-        clock.tick(FPS)
 
 def high_score_screen():
     """Display the top high scores from the game."""
-    scores = load_high_scores()
-
-    # If no scores are loaded, show a message
-    if not scores:
-        scores = ["No high scores yet!"]
-
-    while True:
-        screen.fill(BLACK)
-        
-        # Display the title at the top of the screen
-        draw_text("High Scores", font, GREEN, screen, WIDTH // 2, 100)
-
-        # Display the top scores or a message if no scores exist
-        y_position = 200
-        if scores:
-            for i, score in enumerate(scores[:10]):  # Display the top 10 scores
-                draw_text(f"{i + 1}. {score}", font, WHITE, screen, WIDTH // 2, y_position)
-                y_position += 40  # Adjust space between scores
-        else:
-            draw_text("No high scores yet!", font, WHITE, screen, WIDTH // 2, y_position)
-
-        # Display the "Press ESC to return to Menu" message at the bottom
-        draw_text("Press ESC to return to Menu", font, RED, screen, WIDTH // 2, HEIGHT - 50)
-
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return MENU  # Return to the main menu when ESC is pressed
-
-        pygame.display.update()
-        clock.tick(FPS)
-
-
-
-
-
-
-def display_gif(gif_path, x, y, width, height):
-    """Display a GIF by showing each frame in a loop."""
-    gif = Image.open(gif_path)
-    gif_frames = []
-    for frame in range(gif.n_frames):
-        gif.seek(frame)
-        frame_image = pygame.image.fromstring(gif.convert("RGBA").tobytes(), gif.size, 'RGBA')
-        gif_frames.append(frame_image)
-    
-    frame_count = len(gif_frames)
-    frame_index = 0
-    return gif_frames, frame_count
+    return get_screen(HighScoreScreen).run()
 
 
 def instructions_screen():
     """Display the instructions screen with GIFs side by side."""
-    swipe_gif_path = 'assets/swipe.gif'  # Path to swipe.gif
-    scroll_gif_path = 'assets/scroll.gif'  # Path to scroll.gif
-    
-    # Load GIFs
-    swipe_gif_frames, swipe_frame_count = display_gif(swipe_gif_path, WIDTH // 4 - 100, HEIGHT // 8, 200, 200)
-    scroll_gif_frames, scroll_frame_count = display_gif(scroll_gif_path, 3 * WIDTH // 4 - 100, HEIGHT // 8, 200, 200)
-
-    swipe_frame_index = 0
-    scroll_frame_index = 0
-    swipe_frame_delay = 5  # Adjust this to control speed of the swipe gif
-    scroll_frame_delay = 5  # Adjust this to control speed of the scroll gif
-    swipe_frame_counter = 0
-    scroll_frame_counter = 0
-
-    # Scale GIFs to fit within the window (800x600)
-    max_width = 400  # Max width for each GIF
-    max_height = 300  # Max height for each GIF
-
-    def scale_image(image, max_width, max_height):
-        """Scale the image to fit within the max width and height."""
-        width, height = image.get_width(), image.get_height()
-        aspect_ratio = width / height
-        if width > height:
-            new_width = min(width, max_width)
-            new_height = new_width / aspect_ratio
-        else:
-            new_height = min(height, max_height)
-            new_width = new_height * aspect_ratio
-        return pygame.transform.scale(image, (int(new_width), int(new_height)))
-
-    # Scale images to fit the window
-    swipe_gif_frames = [scale_image(frame, max_width, max_height) for frame in swipe_gif_frames]
-    scroll_gif_frames = [scale_image(frame, max_width, max_height) for frame in scroll_gif_frames]
-
-    while True:
-        screen.fill(BLACK)
-        
-        # Draw the swipe GIF frame at the top
-        screen.blit(swipe_gif_frames[swipe_frame_index], (WIDTH // 4 - swipe_gif_frames[swipe_frame_index].get_width() // 2, 50))
-
-        # Draw the scroll GIF frame at the top
-        screen.blit(scroll_gif_frames[scroll_frame_index], (3 * WIDTH // 4 - scroll_gif_frames[scroll_frame_index].get_width() // 2, 50))
-
-        # Display instructions text slightly higher
-        draw_text("Instructions:", font, GREEN, screen, WIDTH // 2, HEIGHT // 2 + 120)
-        draw_text("Use hand gestures to control the snake", font, WHITE, screen, WIDTH // 2, HEIGHT // 2 + 150)
-        draw_text("Swipe to change direction", font, WHITE, screen, WIDTH // 2, HEIGHT // 2 + 180)
-        draw_text("Make sure swipe gestures occur within the camera", font, WHITE, screen, WIDTH // 2, HEIGHT // 2 + 210)
-
-        # Handle input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return MENU  # Return to the menu when ESC is pressed
-
-        # Cycle through the swipe GIF frames with a delay
-        swipe_frame_counter += 1
-        if swipe_frame_counter >= swipe_frame_delay:
-            swipe_frame_index = (swipe_frame_index + 1) % swipe_frame_count
-            swipe_frame_counter = 0
-        
-        # Cycle through the scroll GIF frames with a delay
-        scroll_frame_counter += 1
-        if scroll_frame_counter >= scroll_frame_delay:
-            scroll_frame_index = (scroll_frame_index + 1) % scroll_frame_count
-            scroll_frame_counter = 0
-
-        pygame.display.update()
-        clock.tick(FPS)
+    return get_screen(InstructionsScreen).run()
 
 # Main loop
 # Main loop in menu.py
 def main():
     global current_state
+    setup()
     play_background_music()
 
     while True:
@@ -0,0 +1,125 @@
+"""Frame-stage profiler with an on-screen summary and Chrome trace export.
+
+Enabled with SNAKE_PROFILE=1. Hot-path stages are wrapped in
+``with profiler.stage(name):``; each stage keeps its last ``window``
+durations for the p50/p99 summary, and every span is also kept (up to
+``trace_capacity``) for SNAKE_PROFILE_TRACE=<path>, which writes a Chrome
+trace-event JSON at exit that chrome://tracing or Perfetto can open. Spans
+record the thread they ran on, so the game loop and the gesture thread show
+up as separate tracks. A ``{pid}`` in the path is replaced by the process
+id, for runs where gesture detection has its own process.
+
+When profiling is off, ``stage()`` returns a shared no-op context manager.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+PROFILE_ENV = 'SNAKE_PROFILE'
+TRACE_ENV = 'SNAKE_PROFILE_TRACE'
+
+
+class _Stage:
+    """Times one named stage; reused for every span of that stage on its thread."""
+
+    __slots__ = ('name', 'durations', 'trace', 'thread', '_start')
+
+    def __init__(self, name, window, trace):
+        self.name = name
+        self.durations = deque(maxlen=window)
+        self.trace = trace
+        self.thread = threading.get_ident()
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.durations.append(end - self._start)
+        self.trace.append((self.name, self.thread, self._start, end - self._start))
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    def __init__(self, enabled=False, window=300, trace_capacity=200_000):
+        self.enabled = enabled
+        self.window = window
+        self.trace = deque(maxlen=trace_capacity)  # (name, thread id, start ns, duration ns)
+        self.frame_times = deque(maxlen=window)
+        self._stages = {}  # (thread id, name) -> _Stage
+        self._last_frame = None
+        self._thread_names = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        key = (threading.get_ident(), name)
+        stage = self._stages.get(key)
+        if stage is None:
+            stage = self._stages[key] = _Stage(name, self.window, self.trace)
+            self._thread_names[key[0]] = threading.current_thread().name
+        return stage
+
+    def frame(self):
+        """Mark the end of a frame, for the FPS figure."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._last_frame is not None:
+            self.frame_times.append(now - self._last_frame)
+        self._last_frame = now
+
+    @staticmethod
+    def _percentile(values, percent):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+    def summary_lines(self):
+        """One line per stage with its rolling p50/p99 in milliseconds, after the FPS."""
+        lines = []
+        if self.frame_times:
+            fps = 1e9 * len(self.frame_times) / sum(self.frame_times)
+            lines.append(f"FPS {fps:.1f}  frame p99 {self._percentile(self.frame_times, 99) / 1e6:.1f} ms")
+        for (thread, name), stage in list(self._stages.items()):
+            durations = list(stage.durations)
+            if durations:
+                lines.append(f"{self._thread_names[thread]}/{name}: p50 {self._percentile(durations, 50) / 1e6:.2f} ms"
+                             f"  p99 {self._percentile(durations, 99) / 1e6:.2f} ms")
+        return lines
+
+    def trace_events(self):
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': name}}
+                  for thread, name in self._thread_names.items()]
+        events.extend({'name': name, 'ph': 'X', 'pid': pid, 'tid': thread, 'ts': start / 1000, 'dur': duration / 1000}
+                      for name, thread, start, duration in list(self.trace))
+        return events
+
+    def dump_trace(self, path):
+        path = path.replace('{pid}', str(os.getpid()))
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, file)
+
+
+# One profiler per process, shared by the game loop, the renderer and gesture detection
+profiler = Profiler(enabled=os.environ.get(PROFILE_ENV, '0') == '1' or bool(os.environ.get(TRACE_ENV)))
+if profiler.enabled and os.environ.get(TRACE_ENV):
+    atexit.register(profiler.dump_trace, os.environ[TRACE_ENV])
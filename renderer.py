@@ -0,0 +1,309 @@
+import pygame
+
+from profiler import profiler
+
+
+class Camera:
+    """Which part of the board is on screen, as the board pixel at the screen's top-left.
+
+    The view scrolls only when the followed point leaves the middle of the
+    screen (``margin`` of the view from each edge) and never past the board
+    edges. A board no bigger than the screen stays put, centred.
+    """
+
+    def __init__(self, view_size, margin=0.3):
+        self.view_width, self.view_height = view_size
+        self.margin = margin
+        self.x = self.y = 0.0
+        self.snap = True
+
+    def reset(self):
+        """Centre on the next followed point instead of scrolling to it."""
+        self.snap = True
+
+    def _axis(self, offset, target, view, board):
+        if board <= view:
+            return (board - view) // 2
+        if self.snap:
+            offset = target - view / 2
+        else:
+            low, high = offset + view * self.margin, offset + view * (1 - self.margin)
+            if target < low:
+                offset -= low - target
+            elif target > high:
+                offset += target - high
+        return min(max(offset, 0), board - view)
+
+    def follow(self, x, y, board_width, board_height):
+        """Scroll so the board pixel (x, y) is inside the middle of the view."""
+        self.x = self._axis(self.x, x, self.view_width, board_width)
+        self.y = self._axis(self.y, y, self.view_height, board_height)
+        self.snap = False
+
+    @property
+    def offset(self):
+        return round(self.x), round(self.y)
+
+
+class FullRenderer:
+    """Redraws the whole game screen every frame.
+
+    ``alpha`` is how far the current tick has progressed (0 to 1): the head
+    slides from its previous cell into the current one and a released tail
+    cell slides after the new tail, so movement looks smooth when frames
+    are drawn more often than the snake moves. At 1 the snake is drawn on
+    its cells.
+
+    The board may be bigger than the screen: a Camera follows the head and
+    the background is tiled across the board.
+
+    The background and the body (all but the head) live on a screen-sized
+    layer that is kept up to date cell by cell: ``tick`` after every engine
+    step clears the new head's cell and the released tail cell and paints
+    the old head as body, and when the camera scrolls the layer is shifted
+    and only the uncovered strips are painted. The layer is painted in full,
+    with one ``Surface.blits`` of a segment sprite over the body cells in
+    view, only after ``reset`` or a resize. A frame is then one blit of the
+    layer plus the food, the sliding head and tail and the text, whatever
+    the board size and the snake length.
+    """
+
+    def __init__(self, screen, background, food_image, block, colors):
+        self.screen = screen
+        self.background = background
+        self.food_image = food_image
+        self.block = block
+        self.head_color, self.body_color, self.food_color = colors
+        self.segment = pygame.Surface((block, block)).convert(screen)
+        self.segment.fill(self.body_color)
+        self.layer = None
+        self.layer_stale = True
+        self.layer_dirty = []  # Screen rects of layer cells changed since the last frame
+        self.camera = Camera(screen.get_size())
+        self.offset = (0, 0)
+
+    def reset(self):
+        """Forget what is on screen, e.g. after another screen drew over it or a new game started."""
+        self.camera.reset()
+        self.layer_stale = True
+        self.layer_dirty.clear()
+
+    def follow(self, state, alpha):
+        """Move the camera with the sliding head and bring the layer in line; return whether the view scrolled."""
+        if self.layer is None or self.layer.get_size() != self.screen.get_size():
+            self.layer = pygame.Surface(self.screen.get_size()).convert(self.screen)
+            self.camera = Camera(self.screen.get_size())
+            self.layer_stale = True
+        x, y = self.lerp(state.prev_head, state.head, alpha)
+        self.camera.follow((x + 0.5) * self.block, (y + 0.5) * self.block,
+                           state.width * self.block, state.height * self.block)
+        (old_x, old_y), self.offset = self.offset, self.camera.offset
+        if self.layer_stale:
+            self.paint_layer(state, self.layer.get_rect())
+            self.layer_stale = False
+            return True
+        if (old_x, old_y) != self.offset:
+            self.scroll_layer(state, self.offset[0] - old_x, self.offset[1] - old_y)
+            return True
+        return False
+
+    # Positions below are screen pixels (the layer's too): board pixels minus the camera offset
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.block - self.offset[0], y * self.block - self.offset[1], self.block, self.block)
+
+    def food_area(self, state):
+        # No food once the snake fills the board
+        return self.cell_rect(*state.food) if state.food else pygame.Rect(0, 0, 0, 0)
+
+    def draw_food(self, state):
+        rect = self.food_area(state)
+        if not state.food:
+            return
+        if self.food_image:
+            self.screen.blit(self.food_image, rect)
+        else:
+            pygame.draw.rect(self.screen, self.food_color, rect)
+
+    @staticmethod
+    def lerp(start, end, alpha):
+        return start[0] + (end[0] - start[0]) * alpha, start[1] + (end[1] - start[1]) * alpha
+
+    def lerp_rect(self, start, end, alpha):
+        x, y = self.lerp(start, end, alpha)
+        return pygame.Rect(round(x * self.block) - self.offset[0], round(y * self.block) - self.offset[1],
+                           self.block, self.block)
+
+    def moving_parts(self, state, alpha):
+        """Rects and colors of the sliding tail and head, in drawing order.
+
+        The head comes last: on a one-cell snake the tail slides along the
+        same cells and would otherwise hide it.
+        """
+        parts = []
+        if state.prev_tail is not None and state.body:
+            parts.append((self.lerp_rect(state.prev_tail, state.body[0], alpha), self.body_color))
+        parts.append((self.lerp_rect(state.prev_head, state.head, alpha), self.head_color))
+        return parts
+
+    def overlay_rect(self, overlay):
+        """Debug overlays sit in the bottom-left corner."""
+        return overlay.get_rect(bottomleft=(0, self.screen.get_height()))
+
+    # Body layer
+
+    def paint_layer(self, state, rect):
+        """Paint the background and the body cells (not the head) under ``rect`` onto the layer."""
+        layer, block, grid, width = self.layer, self.block, state.grid, state.width
+        layer.set_clip(rect)
+        # The background is tiled across the board; blits are clipped to ``rect``
+        tile_width, tile_height = self.background.get_size()
+        ox, oy = self.offset
+        for y in range(rect.top - (rect.top + oy) % tile_height, rect.bottom, tile_height):
+            for x in range(rect.left - (rect.left + ox) % tile_width, rect.right, tile_width):
+                layer.blit(self.background, (x, y))
+
+        # Body cells under the rect, looked up row by row in the occupancy grid
+        left = max((rect.left + ox) // block, 0)
+        right = min((rect.right - 1 + ox) // block + 1, width)
+        head = state.head
+        segment = self.segment
+        cells = []
+        for y in range(max((rect.top + oy) // block, 0), min((rect.bottom - 1 + oy) // block + 1, state.height)):
+            row = y * width
+            cells.extend((segment, (x * block - ox, y * block - oy))
+                         for x, count in enumerate(grid[row + left:row + right], left) if count and (x, y) != head)
+        layer.blits(cells, doreturn=False)
+        layer.set_clip(None)
+
+    def scroll_layer(self, state, dx, dy):
+        """Shift the layer by the camera movement and paint the strips it uncovered."""
+        width, height = self.layer.get_size()
+        if abs(dx) >= width or abs(dy) >= height:
+            self.paint_layer(state, self.layer.get_rect())
+            return
+        self.layer.scroll(-dx, -dy)
+        if dx:
+            self.paint_layer(state, pygame.Rect(width - dx if dx > 0 else 0, 0, abs(dx), height))
+        if dy:
+            self.paint_layer(state, pygame.Rect(0, height - dy if dy > 0 else 0, width, abs(dy)))
+
+    def tick(self, state):
+        """Update the layer after an engine step; call it after every step that did not end the game."""
+        if self.layer_stale:
+            return
+        head = state.head
+        view = self.layer.get_rect()
+        # The head is drawn sliding over the background; a released tail cell goes back to the background
+        for cell in (head, state.prev_tail):
+            if cell is not None and (cell == head or not state.grid[cell[1] * state.width + cell[0]]):
+                rect = self.cell_rect(*cell)
+                if rect.colliderect(view):
+                    self.paint_layer(state, rect)
+                    self.layer_dirty.append(rect)
+        # The old head is body now, unless the snake did not move or left it
+        x, y = state.prev_head
+        if (x, y) != head and state.grid[y * state.width + x]:
+            rect = self.cell_rect(x, y)
+            if rect.colliderect(view):
+                self.layer.blit(self.segment, rect)
+                self.layer_dirty.append(rect)
+
+    def draw_frame(self, state, score_surface, overlay, moving):
+        with profiler.stage('background'):
+            self.screen.blit(self.layer, (0, 0))
+            self.layer_dirty.clear()
+            self.draw_food(state)
+        with profiler.stage('snake'):
+            for rect, color in moving:
+                pygame.draw.rect(self.screen, color, rect)
+        with profiler.stage('score'):
+            self.screen.blit(score_surface, (0, 0))
+            if overlay:
+                self.screen.blit(overlay, self.overlay_rect(overlay))
+        with profiler.stage('display.update'):
+            pygame.display.update()
+
+    def draw(self, state, score_surface, overlay=None, alpha=1.0):
+        self.follow(state, alpha)
+        self.draw_frame(state, score_surface, overlay, self.moving_parts(state, alpha))
+
+
+class DirtyRectRenderer(FullRenderer):
+    """Keeps the previous frame on screen and repaints only what changed.
+
+    Each frame the layer cells changed by ``tick``, the sliding head and
+    tail, the old and new food, the score and the debug overlay are
+    repainted (layer, food, snake, score, overlay) with the screen clipped
+    to the changed area, and only those rects are pushed with
+    ``pygame.display.update(rects)``. Frames where the camera scrolls are
+    composed in full.
+    """
+
+    def __init__(self, screen, background, food_image, block, colors):
+        super().__init__(screen, background, food_image, block, colors)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.full_redraw = True
+        self.moving = []
+        self.food_rect = None
+        self.score_rect = None
+        self.score = None
+        self.overlay = None
+        self.overlay_area = None
+
+    def repaint(self, rect, state, score_surface, overlay, moving):
+        screen = self.screen
+        screen.set_clip(rect)
+        screen.blit(self.layer, rect, rect)
+
+        if self.food_area(state).colliderect(rect):
+            self.draw_food(state)
+
+        for part, color in moving:
+            if part.colliderect(rect):
+                pygame.draw.rect(screen, color, part)
+
+        if score_surface.get_rect().colliderect(rect):
+            screen.blit(score_surface, (0, 0))
+        if overlay and self.overlay_rect(overlay).colliderect(rect):
+            screen.blit(overlay, self.overlay_rect(overlay))
+        screen.set_clip(None)
+
+    def draw(self, state, score_surface, overlay=None, alpha=1.0):
+        scrolled = self.follow(state, alpha)
+        food_rect = self.food_area(state)
+        score_rect = score_surface.get_rect()
+        overlay_area = self.overlay_rect(overlay) if overlay else None
+        moving = self.moving_parts(state, alpha)
+
+        if self.full_redraw or scrolled:
+            self.draw_frame(state, score_surface, overlay, moving)
+            self.full_redraw = False
+        else:
+            # Layer cells changed by the ticks since the last frame, and where the sliding
+            # head and tail were drawn last frame and are drawn now
+            dirty = self.layer_dirty
+            self.layer_dirty = []
+            dirty.extend(part for part, _ in self.moving)
+            dirty.extend(part for part, _ in moving)
+            if food_rect != self.food_rect:
+                dirty.extend((self.food_rect, food_rect))
+            if state.score != self.score:
+                dirty.append(score_rect.union(self.score_rect))
+            if overlay is not self.overlay:
+                dirty.extend(area for area in (self.overlay_area, overlay_area) if area)
+            with profiler.stage('repaint'):
+                for rect in dirty:
+                    self.repaint(rect, state, score_surface, overlay, moving)
+            with profiler.stage('display.update'):
+                pygame.display.update(dirty)
+
+        self.moving = moving
+        self.food_rect = food_rect
+        self.score_rect = score_rect
+        self.score = state.score
+        self.overlay = overlay
+        self.overlay_area = overlay_area
@@ -0,0 +1,230 @@
+"""Score history and high-score table.
+
+Every final score is appended to a journal, ``high_scores.txt``, as one
+``score<TAB>name<TAB>timestamp`` line (older files with a bare score per
+line are still read). A line that a crash left without its newline is
+closed with a NUL mark by the next append and skipped. The best ``top_k``
+entries are kept in a bounded min-heap. Every ``compact_every`` appends,
+the heap and the journal length it covers are written atomically to an
+index file next to the journal. Opening the store then reads the index and
+only the journal lines written after it, so the start-up cost does not
+grow with the history.
+"""
+import atexit
+import functools
+import heapq
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+HIGH_SCORES_FILE = 'high_scores.txt'
+TOP_K = 10
+DEFAULT_PLAYER = os.environ.get('SNAKE_PLAYER', 'Player')
+
+ScoreEntry = namedtuple('ScoreEntry', ['score', 'name', 'timestamp'])
+
+# Ends a line that a crash cut short, so it is never read as an entry
+TORN_MARK = '\x00'
+
+
+def index_path(path):
+    return path + '.top'
+
+
+def write_atomic(path, data):
+    """Replace ``path`` with ``data`` (text or bytes) so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def format_entry(entry):
+    # Tabs, line breaks and the torn-line mark in names would break the journal format
+    name = ' '.join(str(entry.name).replace(TORN_MARK, '').split())
+    return f"{int(entry.score)}\t{name}\t{entry.timestamp:.3f}\n"
+
+
+def parse_entry(line):
+    """Parse a journal line; return a ScoreEntry or None for blank, invalid and torn lines."""
+    if TORN_MARK in line:
+        return None
+    fields = line.strip().split('\t')
+    try:
+        score = int(fields[0])
+        timestamp = float(fields[2]) if len(fields) > 2 else 0.0
+    except ValueError:
+        return None
+    return ScoreEntry(score, fields[1] if len(fields) > 1 else '', timestamp)
+
+
+class ScoreStore:
+    """Append-only score journal with an indexed top-K table."""
+
+    def __init__(self, path=HIGH_SCORES_FILE, top_k=TOP_K, compact_every=1000):
+        self.path = path
+        self.top_k = top_k
+        self.compact_every = compact_every
+        self.count = 0  # Entries in the journal
+        self._heap = []  # (score, -timestamp, name): the worst of the top K is at the front
+        self._offset = 0  # Journal bytes covered by the heap
+        self._since_compaction = 0
+        self._top = None
+        self._lock = threading.Lock()
+        with self._lock:
+            if not self._load_index():
+                self._heap, self._offset, self.count = [], 0, 0
+            self._read_journal()
+
+    def _push(self, entry):
+        item = (entry.score, -entry.timestamp, entry.name)
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+        else:
+            return
+        self._top = None
+
+    def _load_index(self):
+        try:
+            with open(index_path(self.path)) as file:
+                offset, count = (int(field) for field in file.readline().split('\t'))
+                entries = [parse_entry(line) for line in file]
+        except (OSError, ValueError):
+            return False
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < offset or None in entries:
+            return False  # The journal was replaced or the index is damaged
+        self._heap, self._offset, self.count = [], offset, count
+        for entry in entries:
+            self._push(entry)
+        return True
+
+    def _read_journal(self):
+        """Add the journal lines written since ``self._offset``."""
+        try:
+            with open(self.path, 'rb') as file:
+                file.seek(self._offset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+        # A line without its newline is still being written; leave it for later
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode(errors='replace').splitlines():
+            entry = parse_entry(line)
+            if entry:
+                self._push(entry)
+                self.count += 1
+                self._since_compaction += 1
+        self._offset += end
+        if self._since_compaction >= self.compact_every:
+            self._compact()
+
+    def _unterminated(self):
+        with open(self.path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) != b'\n'
+
+    def _compact(self):
+        """Write the top-K table and the journal length it covers to the index file."""
+        lines = [f"{self._offset}\t{self.count}\n"]
+        lines.extend(format_entry(entry) for entry in self._sorted())
+        try:
+            write_atomic(index_path(self.path), ''.join(lines))
+            self._since_compaction = 0
+        except OSError as e:
+            print(f"Could not save the high-score index: {e}")
+
+    def _sorted(self):
+        if self._top is None:
+            self._top = [ScoreEntry(score, name, -negative_time)
+                         for score, negative_time, name in sorted(self._heap, reverse=True)]
+        return self._top
+
+    def add_many(self, entries):
+        """Append ``entries`` to the journal in one write."""
+        if not entries:
+            return
+        with self._lock:
+            data = ''.join(format_entry(entry) for entry in entries).encode()
+            with open(self.path, 'ab') as file:
+                if file.tell() > self._offset and self._unterminated():
+                    # A line without its newline was cut short by a crash: mark it torn and start afresh
+                    data = (TORN_MARK + '\n').encode() + data
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            # Read the new lines back, with any that other processes appended
+            self._read_journal()
+
+    def add(self, score, name=DEFAULT_PLAYER, timestamp=None):
+        entry = ScoreEntry(int(score), name, time.time() if timestamp is None else timestamp)
+        self.add_many([entry])
+        return entry
+
+    def top(self, n=TOP_K):
+        """Best ``n`` (at most ``top_k``) entries, highest first, earliest first on ties."""
+        with self._lock:
+            self._read_journal()
+            return self._sorted()[:n]
+
+    def close(self):
+        with self._lock:
+            if self._since_compaction:
+                self._compact()
+
+
+@functools.lru_cache(maxsize=None)
+def open_store(path=HIGH_SCORES_FILE):
+    """Return the store for ``path`` shared by everything in this process."""
+    store = ScoreStore(path)
+    atexit.register(store.close)
+    return store
+
+
+class ScoreWriter:
+    """Persists final scores from a background thread, off the frame loop."""
+
+    def __init__(self, path=HIGH_SCORES_FILE, name=DEFAULT_PLAYER):
+        self.path = path
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, score, name=None):
+        self._queue.put(ScoreEntry(int(score), name or self.name, time.time()))
+
+    def close(self):
+        """Flush pending scores and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        store = open_store(self.path)
+        running = True
+        while running:
+            # Take everything queued so far and write it in one go
+            pending = [self._queue.get()]
+            while not self._queue.empty():
+                pending.append(self._queue.get())
+            running = None not in pending
+            try:
+                store.add_many([entry for entry in pending if entry is not None])
+            except OSError as e:
+                print(f"Could not save scores: {e}")
+        store.close()
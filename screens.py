@@ -0,0 +1,160 @@
+"""Event-driven menu screens.
+
+A screen is drawn once when it opens and then only when something changes:
+a button gains or loses the hover, its label changes, the screen's own
+state changes or an animation reaches its next frame. In between the loop
+blocks in ``pygame.event.wait``, so an idle menu uses next to no CPU. Text
+is rendered once into cached surfaces.
+"""
+import sys
+
+import pygame
+
+IDLE_TIMEOUT_MS = 1000  # Longest blocking wait when nothing is animating
+
+
+class Label:
+    """Text rendered once; re-rendered only when the text changes.
+
+    ``anchor`` names the rect attribute placed at ``position`` (e.g. 'center', 'topleft').
+    """
+
+    def __init__(self, text, font, color, position, anchor='center'):
+        self.font = font
+        self.color = color
+        self.position = position
+        self.anchor = anchor
+        self.text = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        """Change the text; return whether it changed."""
+        if text == self.text:
+            return False
+        self.text = text
+        self.surface = self.font.render(text, True, self.color)
+        self.rect = self.surface.get_rect(**{self.anchor: self.position})
+        return True
+
+    def draw(self, surface):
+        surface.blit(self.surface, self.rect)
+
+
+class Button:
+    """Filled rectangle with a cached label; ``value`` is what clicking it returns."""
+
+    def __init__(self, text, rect, font, color, hover_color, text_color, value=None, border=None):
+        self.rect = pygame.Rect(rect)
+        self.color = color
+        self.hover_color = hover_color
+        self.border = border  # (color, width) or None
+        self.value = value if value is not None else text
+        self.label = Label(text, font, text_color, self.rect.center)
+        self.hovered = False
+
+    def set_text(self, text):
+        return self.label.set_text(text)
+
+    def hover(self, pos):
+        """Update the hover state for the mouse at ``pos``; return whether it changed."""
+        hovered = self.rect.collidepoint(pos)
+        changed = hovered != self.hovered
+        self.hovered = hovered
+        return changed
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.hover_color if self.hovered else self.color, self.rect)
+        if self.border:
+            pygame.draw.rect(surface, self.border[0], self.rect, self.border[1])
+        self.label.draw(surface)
+
+
+class Screen:
+    """Base class for a screen run by ``run()``.
+
+    Subclasses draw the whole screen in ``draw()``, react to events in
+    ``handle()`` and call ``invalidate()`` when their state changes. A
+    result other than None from ``handle()`` or ``on_click()`` leaves the
+    screen and is returned by ``run()``. Animated screens invalidate
+    themselves in ``update()`` when a new frame is due and return the delay
+    until the next one from ``next_frame_ms()``.
+    """
+
+    def __init__(self, surface, buttons=()):
+        self.surface = surface
+        self.buttons = list(buttons)
+        self._full_redraw = True
+        self._dirty = []
+
+    def invalidate(self, rect=None):
+        """Redraw ``rect`` on the next pass, or the whole screen when no rect is given."""
+        if rect is None:
+            self._full_redraw = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def enter(self):
+        """Called each time the screen opens."""
+
+    def draw(self):
+        for button in self.buttons:
+            button.draw(self.surface)
+
+    def update(self):
+        """Called before every redraw check."""
+
+    def next_frame_ms(self):
+        return None  # Not animated
+
+    def on_click(self, button):
+        return button.value
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.MOUSEMOTION:
+            for button in self.buttons:
+                if button.hover(event.pos):
+                    self._redraw_button(button)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            for button in self.buttons:
+                if button.rect.collidepoint(event.pos):
+                    return self.on_click(button)
+        return None
+
+    def set_button_text(self, button, text):
+        if button.set_text(text):
+            self._redraw_button(button)
+
+    def _redraw_button(self, button):
+        # Buttons are opaque, so repainting one needs nothing underneath
+        button.draw(self.surface)
+        self.invalidate(button.rect)
+
+    def _present(self):
+        if self._full_redraw:
+            self.draw()
+            pygame.display.update()
+        elif self._dirty:
+            pygame.display.update(self._dirty)
+        self._full_redraw = False
+        self._dirty = []
+
+    def run(self):
+        pos = pygame.mouse.get_pos()
+        for button in self.buttons:
+            button.hover(pos)
+        self.enter()
+        self.invalidate()
+        while True:
+            self.update()
+            self._present()
+            delay = self.next_frame_ms()
+            event = pygame.event.wait(IDLE_TIMEOUT_MS if delay is None else max(int(delay), 1))
+            if event.type == pygame.NOEVENT:
+                continue
+            for event in [event] + pygame.event.get():
+                result = self.handle(event)
+                if result is not None:
+                    return result
@@ -0,0 +1,379 @@
+"""Snake rules without any rendering: usable headless, from bots and from benchmarks.
+
+Positions are grid cells, not pixels. ``step`` advances one board by one tick
+and ``BatchEngine`` advances many independent boards at once with NumPy.
+This module must not import pygame.
+"""
+import random
+from collections import deque, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Directions and their cell offsets
+DIRECTIONS = {'LEFT': (-1, 0), 'RIGHT': (1, 0), 'UP': (0, -1), 'DOWN': (0, 1)}
+OPPOSITE = {'LEFT': 'RIGHT', 'RIGHT': 'LEFT', 'UP': 'DOWN', 'DOWN': 'UP'}
+
+# Speed ramp (ticks per second)
+START_SPEED = 5
+MAX_SPEED = 15
+SPEED_STEP = 0.2
+
+# Results of a tick
+MOVED = 0
+ATE = 1
+DIED = 2
+
+
+class SnakeState:
+    """Everything needed to advance one game."""
+
+    def __init__(self, width, height, speed=START_SPEED, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+
+        self.x, self.y = width // 2, height // 2
+        self.dx, self.dy = 0, 0  # The snake waits for the first turn
+        # Head cell before the last tick, and the tail cell it released (None if it did not move)
+        self.prev_head = (self.x, self.y)
+        self.prev_tail = None
+        self.direction = 'RIGHT'
+        self.body = deque()  # Cells from tail to head
+        self.grid = bytearray(width * height)  # Body segments per cell, indexed y * width + x
+        # Cells with no body segment in any order, and each cell's index in that list (-1 if occupied),
+        # so a free cell is claimed or released by swapping with the last entry
+        self.free = all_cells(width * height)
+        self.free_pos = all_cells(width * height)
+        self.body.append((self.x, self.y))
+        occupy(self, self.y * width + self.x)
+        self.grid[self.y * width + self.x] = 1
+        self.length = 1
+        self.speed = speed
+        self.alive = True
+        self.food = None
+        place_food(self)
+
+    @property
+    def score(self):
+        return self.length - 1
+
+    @property
+    def head(self):
+        return self.body[-1] if self.body else (self.x, self.y)
+
+
+@lru_cache(maxsize=8)
+def _cell_range(cells):
+    return tuple(range(cells))
+
+
+def all_cells(cells):
+    """A new list of the cell indices 0 .. cells - 1; copying a cached tuple is faster than range()."""
+    return list(_cell_range(cells))
+
+
+def new_state(width, height, speed=START_SPEED, seed=None):
+    return SnakeState(width, height, speed, seed)
+
+
+def set_body(state, cells, direction='RIGHT'):
+    """Replace the snake with ``cells`` (tail to head) heading in ``direction``."""
+    state.body = deque(cells)
+    state.grid = bytearray(state.width * state.height)
+    state.free = all_cells(state.width * state.height)
+    state.free_pos = all_cells(state.width * state.height)
+    for x, y in state.body:
+        cell = y * state.width + x
+        if not state.grid[cell]:
+            occupy(state, cell)
+        state.grid[cell] += 1
+    state.length = len(state.body)
+    state.x, state.y = state.body[-1]
+    state.prev_head = (state.x, state.y)
+    state.prev_tail = None
+    state.dx, state.dy = DIRECTIONS[direction]
+    state.direction = direction
+    # Food the new body covers moves elsewhere
+    if state.food is None or state.grid[state.food[1] * state.width + state.food[0]]:
+        place_food(state)
+
+
+def occupy(state, cell):
+    """Take ``cell`` out of the free list when the first body segment enters it."""
+    free, pos = state.free, state.free_pos
+    i, last = pos[cell], free[-1]
+    free[i] = last
+    pos[last] = i
+    free.pop()
+    pos[cell] = -1
+
+
+def release(state, cell):
+    """Put ``cell`` back in the free list when its last body segment leaves."""
+    state.free_pos[cell] = len(state.free)
+    state.free.append(cell)
+
+
+def place_food(state):
+    """Move the food to a random cell not covered by the snake, or None once the board is full."""
+    free = state.free
+    if not free:
+        state.food = None
+        return
+    cell = free[int(state.rng.random() * len(free))]
+    state.food = (cell % state.width, cell // state.width)
+
+
+def turn(state, action):
+    """Apply a direction change unless it would reverse the snake; return whether it applied.
+
+    Before the first move any direction is taken, as ``heading`` is then None.
+    """
+    if action in DIRECTIONS and (state.direction != OPPOSITE[action] or not (state.dx or state.dy)):
+        state.dx, state.dy = DIRECTIONS[action]
+        state.direction = action
+        return True
+    return False
+
+
+def heading(state):
+    """Direction the snake is moving in, or None while it waits for the first turn."""
+    return state.direction if state.dx or state.dy else None
+
+
+def step(state, action=None):
+    """Advance ``state`` by one tick and return MOVED, ATE or DIED."""
+    if not state.alive:
+        return DIED
+    turn(state, action)
+
+    x, y = state.x + state.dx, state.y + state.dy
+    if x >= state.width or x < 0 or y >= state.height or y < 0:
+        state.alive = False
+        return DIED
+    state.prev_head = (state.x, state.y)
+    state.x, state.y = x, y
+
+    # Drop the tail first so the head may follow it into the cell it leaves
+    body, grid = state.body, state.grid
+    state.prev_tail = None
+    if len(body) >= state.length:
+        tx, ty = state.prev_tail = body.popleft()
+        tail = ty * state.width + tx
+        grid[tail] -= 1
+        if not grid[tail]:
+            release(state, tail)
+
+    cell = y * state.width + x
+    if (state.dx or state.dy) and grid[cell]:
+        state.alive = False
+        return DIED
+    body.append((x, y))
+    if not grid[cell]:
+        occupy(state, cell)
+    grid[cell] += 1
+
+    if (x, y) == state.food:
+        place_food(state)
+        state.length += 1
+        state.speed = min(state.speed + SPEED_STEP, MAX_SPEED)
+        return ATE
+    return MOVED
+
+
+# A pending turn: direction, time it was issued, and anything the caller wants back
+Turn = namedtuple('Turn', ['direction', 'timestamp', 'payload'])
+
+
+class TurnQueue:
+    """Bounded queue of pending turns, drained one per tick.
+
+    Every turn is accepted as soon as it arrives, as long as it is a real
+    turn relative to the direction the snake will have once the turns
+    already queued are applied (not straight ahead, not a reversal); a
+    heading of None (snake not moving yet) accepts any direction. ``pop``
+    checks again against the actual heading, since expired turns may have
+    been skipped. A turn's ``timestamp`` is when its gesture was captured
+    (time.monotonic), not when it was queued, and turns older than
+    ``max_age`` seconds by then are dropped, so gestures buffered while no
+    game was running do not steer the next one.
+    Rejected, overflowing and expired turns are passed to ``on_drop``.
+    """
+
+    def __init__(self, capacity=3, max_age=0.5, on_drop=None):
+        self.capacity = capacity
+        self.max_age = max_age
+        self.on_drop = on_drop
+        self._turns = deque()
+
+    def _drop(self, turn):
+        if self.on_drop:
+            self.on_drop(turn)
+
+    @staticmethod
+    def _valid(direction, current):
+        if direction not in DIRECTIONS:
+            return False
+        return current is None or direction not in (current, OPPOSITE[current])
+
+    def push(self, direction, timestamp, current, payload=None):
+        """Queue a turn given the snake's current heading; return whether it was accepted."""
+        turn = Turn(direction, timestamp, payload)
+        if self._turns:
+            current = self._turns[-1].direction
+        if not self._valid(direction, current) or len(self._turns) >= self.capacity:
+            self._drop(turn)
+            return False
+        self._turns.append(turn)
+        return True
+
+    def pop(self, now, current):
+        """Return the next turn still valid at ``now`` for heading ``current``, or None."""
+        while self._turns:
+            turn = self._turns.popleft()
+            if now - turn.timestamp > self.max_age or not self._valid(turn.direction, current):
+                self._drop(turn)
+                continue
+            return turn
+        return None
+
+
+# Direction indices used by the batched engine
+LEFT, RIGHT, UP, DOWN = range(4)
+DIRECTION_INDEX = {'LEFT': LEFT, 'RIGHT': RIGHT, 'UP': UP, 'DOWN': DOWN}
+NO_ACTION = -1
+_DX = np.array([-1, 1, 0, 0], dtype=np.int32)
+_DY = np.array([0, 0, -1, 1], dtype=np.int32)
+_OPPOSITE = np.array([RIGHT, LEFT, DOWN, UP], dtype=np.int8)
+
+
+class BatchEngine:
+    """Many independent boards advanced together with the same rules as ``step``.
+
+    Board state lives in NumPy arrays indexed by board. Each body is a ring of
+    flat cell indices (``y * width + x``) next to an occupancy count per cell,
+    so a tick is a handful of vectorised operations whatever the batch size.
+    Actions are direction indices (LEFT, RIGHT, UP, DOWN) or NO_ACTION.
+    Food goes on a free cell, as in ``place_food``; a full board has none
+    (food at -1, -1).
+    """
+
+    FOOD_RETRIES = 8  # Rounds of redrawing food that landed on a body before searching the free cells
+
+    def __init__(self, boards, width, height, speed=START_SPEED, seed=None):
+        self.boards = boards
+        self.width = width
+        self.height = height
+        self.start_speed = speed
+        self.rng = np.random.default_rng(seed)
+
+        cells = width * height
+        self.capacity = cells + 1
+        self.head_x = np.zeros(boards, dtype=np.int32)
+        self.head_y = np.zeros(boards, dtype=np.int32)
+        self.direction = np.zeros(boards, dtype=np.int8)
+        self.moving = np.zeros(boards, dtype=bool)
+        self.length = np.zeros(boards, dtype=np.int32)
+        self.size = np.zeros(boards, dtype=np.int32)
+        self.head_ptr = np.zeros(boards, dtype=np.int64)
+        self.body = np.zeros((boards, self.capacity), dtype=np.int32)
+        self.occupancy = np.zeros((boards, cells), dtype=np.uint8)
+        self.food_x = np.zeros(boards, dtype=np.int32)
+        self.food_y = np.zeros(boards, dtype=np.int32)
+        self.speed = np.zeros(boards, dtype=np.float32)
+        self.alive = np.zeros(boards, dtype=bool)
+        self.ticks = 0
+        self.reset()
+
+    @property
+    def score(self):
+        return self.length - 1
+
+    def _place_food(self, idx):
+        cells = self.width * self.height
+        food = self.rng.integers(0, cells, size=len(idx))
+        # Redraw food that landed on a body; boards still missing it after that are nearly full,
+        # so pick from their free cells directly
+        for _ in range(self.FOOD_RETRIES):
+            taken = self.occupancy[idx, food] > 0
+            if not taken.any():
+                break
+            food[taken] = self.rng.integers(0, cells, size=np.count_nonzero(taken))
+        else:
+            for i in np.flatnonzero(self.occupancy[idx, food] > 0):
+                free = np.flatnonzero(self.occupancy[idx[i]] == 0)
+                food[i] = self.rng.choice(free) if len(free) else -1
+        self.food_x[idx] = np.where(food >= 0, food % self.width, -1)
+        self.food_y[idx] = np.where(food >= 0, food // self.width, -1)
+
+    def reset(self, mask=None):
+        """Start a new game on every board, or on the boards selected by ``mask``."""
+        idx = np.arange(self.boards) if mask is None else np.flatnonzero(mask)
+        self.head_x[idx] = self.width // 2
+        self.head_y[idx] = self.height // 2
+        self.direction[idx] = RIGHT
+        self.moving[idx] = False
+        # The head is the first body segment, as in SnakeState
+        self.length[idx] = 1
+        self.size[idx] = 1
+        self.head_ptr[idx] = 1
+        self.occupancy[idx] = 0
+        start = (self.height // 2) * self.width + self.width // 2
+        self.body[idx, 0] = start
+        self.occupancy[idx, start] = 1
+        self.speed[idx] = self.start_speed
+        self.alive[idx] = True
+        self._place_food(idx)
+
+    def step(self, actions=None):
+        """Advance every live board by one tick; return the (ate, died) masks."""
+        alive_before = self.alive.copy()
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int8)
+            valid = alive_before & (actions >= 0)
+            valid &= (actions != _OPPOSITE[self.direction]) | ~self.moving  # Any first move, as in turn()
+            self.direction[valid] = actions[valid]
+            self.moving |= valid
+
+        step_x = _DX[self.direction] * self.moving
+        step_y = _DY[self.direction] * self.moving
+        x = self.head_x + step_x
+        y = self.head_y + step_y
+
+        # Walls
+        hit_wall = alive_before & ((x >= self.width) | (x < 0) | (y >= self.height) | (y < 0))
+        live = np.flatnonzero(alive_before & ~hit_wall)
+        x, y = x[live], y[live]
+        self.head_x[live] = x
+        self.head_y[live] = y
+        cell = y * self.width + x
+
+        # Drop the tail when the body is about to outgrow its length
+        shrink = live[self.size[live] + 1 > self.length[live]]
+        tail_slot = (self.head_ptr[shrink] - self.size[shrink]) % self.capacity
+        self.occupancy[shrink, self.body[shrink, tail_slot]] -= 1
+        self.size[shrink] -= 1
+
+        # Self collision, then insert the new head
+        hit_self = self.moving[live] & (self.occupancy[live, cell] > 0)
+        self.body[live, self.head_ptr[live] % self.capacity] = cell
+        self.occupancy[live, cell] += 1
+        self.head_ptr[live] += 1
+        self.size[live] += 1
+
+        died = hit_wall
+        died[live[hit_self]] = True
+        self.alive &= ~died
+
+        # Food
+        ate_live = ~hit_self & (self.food_x[live] == x) & (self.food_y[live] == y)
+        eaten = live[ate_live]
+        self.length[eaten] += 1
+        self.speed[eaten] = np.minimum(self.speed[eaten] + SPEED_STEP, MAX_SPEED)
+        self._place_food(eaten)
+
+        ate = np.zeros(self.boards, dtype=bool)
+        ate[eaten] = True
+        self.ticks += 1
+        return ate, died
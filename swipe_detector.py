@@ -0,0 +1,150 @@
+"""Swipe detection over a sliding time window.
+
+A swipe is the displacement of the index/middle fingertip midpoint
+(landmarks 8 and 12) over the last ``window`` seconds, so the thresholds and
+the detection delay are in normalized units and seconds rather than frames:
+a swipe that covers the threshold within the window is reported no later
+than ``window`` after it starts, whatever the camera frame rate. Covering
+the threshold within the window also sets the minimum speed (threshold /
+window), so slow drifts are never reported however far they go.
+"""
+import numpy as np
+
+INDEX_TIP = 8
+MIDDLE_TIP = 12
+
+
+class SwipeDetector:
+    """Stateful swipe detector for one hand; create one instance per hand."""
+
+    __slots__ = ('window', 'threshold_horizontal', 'threshold_vertical',
+                 'horizontal_cooldown', 'vertical_cooldown',
+                 'last_horizontal_gesture_time', 'last_vertical_gesture_time',
+                 '_times', '_points', '_start', '_end')
+
+    def __init__(self, window=0.1, threshold_horizontal=0.1, threshold_vertical=0.1,
+                 horizontal_cooldown=1.0, vertical_cooldown=1.0, capacity=64):
+        self.window = window
+        self.threshold_horizontal = threshold_horizontal
+        self.threshold_vertical = threshold_vertical
+        self.horizontal_cooldown = horizontal_cooldown
+        self.vertical_cooldown = vertical_cooldown
+        self._times = np.zeros(capacity)
+        self._points = np.zeros((capacity, 2))
+        self.reset()
+
+    def reset(self):
+        self.last_horizontal_gesture_time = float('-inf')
+        self.last_vertical_gesture_time = float('-inf')
+        self._start = 0
+        self._end = 0
+
+    def _classify(self, dx, dy, timestamp):
+        """Turn a displacement (dy positive upwards) into a gesture, honoring the cooldowns."""
+        if abs(dx) > abs(dy):
+            if timestamp - self.last_horizontal_gesture_time > self.horizontal_cooldown:
+                if dx > self.threshold_horizontal:
+                    self.last_horizontal_gesture_time = timestamp
+                    return "RIGHT"
+                if dx < -self.threshold_horizontal:
+                    self.last_horizontal_gesture_time = timestamp
+                    return "LEFT"
+        elif timestamp - self.last_vertical_gesture_time > self.vertical_cooldown:
+            if dy > self.threshold_vertical:
+                self.last_vertical_gesture_time = timestamp
+                return "UP"
+            if dy < -self.threshold_vertical:
+                self.last_vertical_gesture_time = timestamp
+                return "DOWN"
+        return None
+
+    def update(self, landmarks, timestamp):
+        """Feed one frame (MediaPipe landmark list or a 21x3 array); return a gesture or None."""
+        if isinstance(landmarks, np.ndarray):
+            x = (landmarks[INDEX_TIP, 0] + landmarks[MIDDLE_TIP, 0]) / 2
+            y = (landmarks[INDEX_TIP, 1] + landmarks[MIDDLE_TIP, 1]) / 2
+        else:
+            index_tip, middle_tip = landmarks[INDEX_TIP], landmarks[MIDDLE_TIP]
+            x = (index_tip.x + middle_tip.x) / 2
+            y = (index_tip.y + middle_tip.y) / 2
+        return self.update_point(x, y, timestamp)
+
+    def update_point(self, x, y, timestamp):
+        """Feed one fingertip midpoint in normalized coordinates; return a gesture or None."""
+        times, points = self._times, self._points
+        if self._end == len(times):
+            # Compact the live window to the front of the buffers, keeping room for one more sample
+            count = min(self._end - self._start, len(times) - 1)
+            times[:count] = times[self._end - count:self._end]
+            points[:count] = points[self._end - count:self._end]
+            self._start, self._end = 0, count
+        times[self._end] = timestamp
+        points[self._end] = x, y
+        self._end += 1
+
+        # Drop samples that fell out of the window
+        self._start += int(np.searchsorted(times[self._start:self._end], timestamp - self.window))
+        x0, y0 = points[self._start]
+        dx, dy = x - x0, y0 - y
+
+        gesture = self._classify(dx, dy, timestamp)
+        if gesture:
+            # The next swipe is measured from here
+            self._start = self._end - 1
+        return gesture
+
+    def detect_batch(self, times, landmarks):
+        """Run a whole recording through the detector.
+
+        ``times`` is (N,) and ``landmarks`` is (N, 21, 3); frames without a
+        hand are NaN and skipped, as the live loop does. Displacements over
+        the window are computed for all frames at once; only frames close
+        to a previous swipe are re-evaluated one by one. Returns a list of
+        (frame index, gesture). The detector state carries over, so batches
+        can be chained.
+        """
+        times = np.asarray(times, dtype=float)
+        landmarks = np.asarray(landmarks)
+        frames = np.flatnonzero(~np.isnan(landmarks[:, INDEX_TIP, 0]) & ~np.isnan(landmarks[:, MIDDLE_TIP, 0]))
+        t = times[frames]
+        points = (landmarks[frames, INDEX_TIP, :2] + landmarks[frames, MIDDLE_TIP, :2]) / 2
+        # Prepend the live window so the first frames see the history of earlier updates
+        history = self._end - self._start
+        t = np.concatenate([self._times[self._start:self._end], t])
+        points = np.concatenate([self._points[self._start:self._end], points])
+
+        # Start of the window for every frame, and the displacement across it
+        start = np.searchsorted(t, t - self.window)
+        dx = points[:, 0] - points[start, 0]
+        dy = points[start, 1] - points[:, 1]
+        horizontal = np.abs(dx) > np.abs(dy)
+        over = np.where(horizontal, np.abs(dx) > self.threshold_horizontal,
+                        np.abs(dy) > self.threshold_vertical)
+        candidates = np.flatnonzero(over[history:]) + history
+
+        emitted = []
+        reset = 0  # Window cannot reach before the last swipe
+        i, n = history, len(t)
+        while i < n:
+            if start[i] >= reset:
+                # Skip ahead to the next frame over the threshold
+                k = np.searchsorted(candidates, i)
+                if k == len(candidates):
+                    break
+                i = candidates[k]
+                gesture = self._classify(dx[i], dy[i], t[i])
+            else:
+                # Within a window of the last swipe: measure from the swipe frame
+                gesture = self._classify(points[i, 0] - points[reset, 0], points[reset, 1] - points[i, 1], t[i])
+            if gesture:
+                emitted.append((int(frames[i - history]), gesture))
+                reset = i
+            i += 1
+
+        # Leave the live window in the buffers for the next update
+        first = max(reset, int(start[-1])) if n else 0
+        tail = min(n - first, len(self._times))
+        self._times[:tail] = t[n - tail:]
+        self._points[:tail] = points[n - tail:]
+        self._start, self._end = 0, tail
+        return emitted
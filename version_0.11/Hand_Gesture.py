@@ -1,21 +1,31 @@
 # HandGesture.py
 import cv2
 import mediapipe as mp
+import os
 import time
 from multiprocessing import Queue
 
 mp_hands = mp.solutions.hands
 hand_detector = mp_hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.7)
 
-def detect_gesture(gesture_queue):
+# Headless mode skips the debug window (GESTURE_HEADLESS=1); otherwise the
+# preview is refreshed at most PREVIEW_FPS times per second
+HEADLESS = os.environ.get('GESTURE_HEADLESS', '0') == '1'
+PREVIEW_FPS = 15
+
+def detect_gesture(gesture_queue, headless=None, stop_event=None, preview_fps=PREVIEW_FPS):
     prev_position = None
     last_gesture_time = 0
     horizontal_cooldown = 0.5
     vertical_cooldown = 0.2
+    if headless is None:
+        headless = HEADLESS
+    preview_interval = 1.0 / preview_fps
+    next_preview_time = 0.0
 
     cap = cv2.VideoCapture(0)
 
-    while cap.isOpened():
+    while cap.isOpened() and (stop_event is None or not stop_event.is_set()):
         ret, frame = cap.read()
         if not ret:
             break
@@ -64,12 +74,21 @@ def detect_gesture(gesture_queue):
 
                 prev_position = (avg_x, avg_y)
 
+        if headless:
+            continue
+
+        now = time.monotonic()
+        if now < next_preview_time:
+            continue
+        next_preview_time = now + preview_interval
+
         cv2.imshow('Hand Gesture Detection', frame)
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
     cap.release()
-    cv2.destroyAllWindows()
+    if not headless:
+        cv2.destroyAllWindows()
 
 if __name__ == "__main__":
     # Gesture queue will be initialized in the controller script